@@ -0,0 +1,158 @@
+"""Offline benchmark for the embedding narrowing step of pick_category.
+
+Generates synthetic category sets, swaps the OpenAI embedder for a deterministic local
+one, and reports category index build time (cold and from disk), per-query latency of
+`_narrow_down_categories`, peak RSS and recall@k against brute-force cosine search.
+Every size runs in a fresh process so peak RSS is per size.
+
+    uv run bench_categories.py --sizes 100 1000 10000 100000 --queries 200
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict
+
+import numpy as np
+
+# hello.py builds an OpenAI client at import time; nothing here talks to the network
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+EMBEDDING_DIM = 256
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+VERBS = ["search", "buy", "view", "add", "remove", "track", "return", "compare", "rate", "share",
+         "cancel", "renew", "upgrade", "download", "report", "schedule"]
+OBJECTS = ["product", "order", "cart", "wishlist", "review", "discount", "account", "password",
+           "invoice", "subscription", "address", "payment", "delivery", "gift card", "warranty"]
+FILLER = ["i", "want", "to", "please", "help", "me", "my", "the", "a", "new", "can", "you"]
+
+
+def fake_embed(text: str) -> list[float]:
+    """Hashed bag-of-words embedding: deterministic, offline, and similar for similar text."""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for token in TOKEN_RE.findall(text.lower()):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % EMBEDDING_DIM
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    return vector.tolist()
+
+
+def synthetic_categories(count: int, seed: int) -> list[Dict[str, str]]:
+    rng = random.Random(seed)
+    categories = []
+    for i in range(count):
+        verb, obj = rng.choice(VERBS), rng.choice(OBJECTS)
+        categories.append({
+            "name": f"{verb.capitalize()} {obj.title()} {i}",
+            "group": obj,
+            "embedding_text": f"{verb} {obj} {rng.choice(OBJECTS)}",
+            "llm_description": f"User wants to {verb} a {obj}",
+        })
+    return categories
+
+
+def synthetic_queries(categories: list[Dict[str, str]], count: int, seed: int) -> list[str]:
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(categories)["embedding_text"].split() + rng.sample(FILLER, 4)
+        rng.shuffle(words)
+        queries.append(" ".join(words))
+    return queries
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    return float(np.percentile(np.asarray(samples), pct)) if samples else 0.0
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def bench_size(num_categories: int, num_queries: int, k: int, seed: int) -> Dict[str, Any]:
+    import hello
+    from category_index import CategoryIndex
+    from similarity import SimilarityIndex
+
+    hello.embed = fake_embed
+    hello.embed_many = lambda texts: [fake_embed(text) for text in texts]
+
+    categories = [hello.Category(**category) for category in synthetic_categories(num_categories, seed)]
+    queries = synthetic_queries([category.model_dump() for category in categories], num_queries, seed)
+    texts = [category.embedding_text for category in categories]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        CategoryIndex(tmp, hello.EMBEDDING_MODEL).sync(texts, hello.embed_many)
+        cold_build_s = time.perf_counter() - start
+
+        # A restarted process memory-maps the stored matrix instead of re-embedding
+        start = time.perf_counter()
+        hello.category_index = CategoryIndex(tmp, hello.EMBEDDING_MODEL)
+        hello.category_index.similarity_index(texts, hello.embed_many)
+        warm_load_s = time.perf_counter() - start
+
+        baseline = SimilarityIndex([fake_embed(text) for text in texts])
+        latencies: list[float] = []
+        recalls: list[float] = []
+        for query in queries:
+            start = time.perf_counter()
+            narrowed = hello._narrow_down_categories(query, categories)
+            latencies.append(time.perf_counter() - start)
+
+            expected = {categories[row].name for row, _ in baseline.top_k(fake_embed(query), k)}
+            routed = {category.name for category in narrowed[:k]}
+            recalls.append(len(expected & routed) / max(1, len(expected)))
+
+    return {
+        "categories": num_categories,
+        "cold_build_s": cold_build_s,
+        "warm_load_s": warm_load_s,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        f"recall@{k}": float(np.mean(recalls)) if recalls else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per size")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        # A fresh process per size keeps peak RSS and module-level state independent
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(bench_size, size, args.queries, args.k, args.seed).result()
+        results.append(result)
+        if args.json:
+            print(json.dumps(result))
+
+    if not args.json:
+        columns = list(results[0].keys())
+        print("  ".join(f"{column:>15}" for column in columns))
+        for result in results:
+            print("  ".join(
+                f"{value:>15.4f}" if isinstance(value, float) else f"{value:>15}"
+                for value in result.values()
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+from similarity import SimilarityIndex, normalize, top_k_indices
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class HierarchicalIndex:
+    """Two-level search: score group centroids first, then only the leaves in the best groups.
+
+    A group's centroid is the mean of its members' normalized embeddings, so groups need no
+    embeddings of their own.
+    """
+
+    def __init__(self, leaves: SimilarityIndex, groups: Sequence[str]):
+        if len(groups) != len(leaves):
+            raise ValueError(f"Expected {len(leaves)} group labels, got {len(groups)}")
+        self.leaves = leaves
+        self.group_names = list(dict.fromkeys(groups))
+        position = {group: i for i, group in enumerate(self.group_names)}
+        labels = np.fromiter((position[group] for group in groups), dtype=np.int64, count=len(groups))
+        order = np.argsort(labels, kind="stable")
+        boundaries = np.cumsum(np.bincount(labels, minlength=len(self.group_names)))[:-1]
+        self.members: list[np.ndarray] = np.split(order, boundaries)
+        self.groups = SimilarityIndex(
+            np.stack([leaves.matrix[rows].mean(axis=0) for rows in self.members])
+            if self.members else np.empty((0, leaves.matrix.shape[1]), dtype=np.float32)
+        )
+
+    def __len__(self) -> int:
+        return len(self.leaves)
+
+    def top_k(self, query: np.ndarray | Sequence[float], k: int, max_groups: int) -> list[tuple[int, float]]:
+        """Return `(leaf_row, cosine_similarity)` for the best `k` leaves in the best `max_groups` groups."""
+        query = normalize(np.asarray(query, dtype=np.float32))
+        best_groups = top_k_indices(self.groups.matrix @ query, max_groups)
+        if len(best_groups) == 0:
+            return []
+        rows = np.concatenate([self.members[group] for group in best_groups])
+        scores = self.leaves.matrix[rows] @ query
+        return [(int(rows[i]), float(scores[i])) for i in top_k_indices(scores, k)]
+
+    def top_k_batch(
+        self, queries: np.ndarray | Sequence[Sequence[float]], k: int, max_groups: int
+    ) -> list[list[tuple[int, float]]]:
+        """`top_k` for a batch of queries, scoring all group centroids in one matrix product."""
+        queries = normalize(np.asarray(queries, dtype=np.float32))
+        if len(queries) == 0:
+            return []
+        best_groups = top_k_indices(queries @ self.groups.matrix.T, max_groups)
+        results = []
+        for query, groups in zip(queries, best_groups):
+            if len(groups) == 0:
+                results.append([])
+                continue
+            rows = np.concatenate([self.members[group] for group in groups])
+            scores = self.leaves.matrix[rows] @ query
+            results.append([(int(rows[i]), float(scores[i])) for i in top_k_indices(scores, k)])
+        return results
+
+
+class CategoryIndex:
+    """On-disk cache of category embeddings.
+
+    Rows live in a contiguous float32 matrix (`embeddings.npy`, memory-mapped on load)
+    and `manifest.json` records which `(model, embedding_text)` hash each row belongs to.
+    Calling `sync` with the current category texts only embeds texts whose hash is not
+    already stored, so editing `load_categories()` costs one embedding per changed entry.
+    """
+
+    def __init__(self, path: str | Path, model: str):
+        self.path = Path(path)
+        self.model = model
+        self.keys: list[str] = []
+        self._texts: list[str] | None = None
+        self.matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self._similarity: SimilarityIndex | None = None
+        self._hierarchy: HierarchicalIndex | None = None
+        self._hierarchy_groups: list[str] = []
+        self._load()
+
+    def _load(self) -> None:
+        manifest_path = self.path / MANIFEST_FILE
+        embeddings_path = self.path / EMBEDDINGS_FILE
+        if not manifest_path.exists() or not embeddings_path.exists():
+            return
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("model") != self.model:
+            # Embeddings from a different model are not comparable, start over
+            return
+        matrix = np.load(embeddings_path, mmap_mode="r")
+        if matrix.ndim != 2 or matrix.shape[0] != len(manifest["keys"]):
+            return
+        self.keys = manifest["keys"]
+        self.matrix = matrix
+
+    def _write(self, keys: list[str], matrix: np.ndarray) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Release the current memory map before swapping the file underneath it
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+
+        tmp_embeddings = self.path / f"{EMBEDDINGS_FILE}.tmp"
+        with open(tmp_embeddings, "wb") as f:
+            np.save(f, matrix)
+        tmp_manifest = self.path / f"{MANIFEST_FILE}.tmp"
+        with open(tmp_manifest, "w") as f:
+            json.dump({"model": self.model, "dim": int(matrix.shape[1]), "keys": keys}, f)
+        os.replace(tmp_embeddings, self.path / EMBEDDINGS_FILE)
+        os.replace(tmp_manifest, self.path / MANIFEST_FILE)
+
+        self.keys = keys
+        self.matrix = np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r")
+        self._similarity = None
+
+    def sync(
+        self,
+        texts: Sequence[str],
+        embed_many: Callable[[list[str]], list[list[float]]],
+    ) -> np.ndarray:
+        """Return a `(len(texts), dim)` matrix whose rows line up with `texts`.
+
+        Only texts that are not in the index yet are passed to `embed_many`. Rows for
+        texts that are no longer requested are dropped when the index is rewritten.
+        """
+        # Comparing the texts is much cheaper than re-hashing them on every call
+        if self._texts is not None and self._texts == list(texts):
+            return self.matrix
+        keys = [embedding_key(self.model, text) for text in texts]
+        if keys == self.keys:
+            self._texts = list(texts)
+            return self.matrix
+
+        existing = {key: row for row, key in enumerate(self.keys)}
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in existing:
+                missing.setdefault(key, text)
+
+        fresh: dict[str, np.ndarray] = {}
+        if missing:
+            vectors = embed_many(list(missing.values()))
+            for key, vector in zip(missing.keys(), vectors):
+                fresh[key] = np.asarray(vector, dtype=np.float32)
+
+        if fresh:
+            dim = len(next(iter(fresh.values())))
+        elif len(keys) > 0:
+            dim = self.matrix.shape[1]
+        else:
+            dim = 0
+
+        matrix = np.empty((len(keys), dim), dtype=np.float32)
+        for row, key in enumerate(keys):
+            matrix[row] = fresh[key] if key in fresh else self.matrix[existing[key]]
+        self._write(keys, matrix)
+        self._texts = list(texts)
+        return self.matrix
+
+    def similarity_index(
+        self,
+        texts: Sequence[str],
+        embed_many: Callable[[list[str]], list[list[float]]],
+    ) -> SimilarityIndex:
+        """Like `sync`, but returns a normalized `SimilarityIndex` reused until the index changes."""
+        matrix = self.sync(texts, embed_many)
+        if self._similarity is None:
+            self._similarity = SimilarityIndex(matrix)
+        return self._similarity
+
+    def hierarchical_index(
+        self,
+        texts: Sequence[str],
+        groups: Sequence[str],
+        embed_many: Callable[[list[str]], list[list[float]]],
+    ) -> HierarchicalIndex:
+        """Like `similarity_index`, with leaves grouped by `groups` (one label per text)."""
+        leaves = self.similarity_index(texts, embed_many)
+        if self._hierarchy is None or self._hierarchy.leaves is not leaves or self._hierarchy_groups != list(groups):
+            self._hierarchy = HierarchicalIndex(leaves, groups)
+            self._hierarchy_groups = list(groups)
+        return self._hierarchy
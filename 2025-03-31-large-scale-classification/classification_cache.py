@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Sequence
+
+import numpy as np
+from similarity import normalize
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class ClassificationCache:
+    """Two-tier cache of classification results.
+
+    The exact tier is an LRU keyed on normalized text. The semantic tier keeps query
+    embeddings in one matrix and returns the cached label of the nearest previous query
+    when its cosine similarity is at least `semantic_threshold`. Both tiers expire entries
+    after `ttl_seconds` and evict least recently used entries past `max_size`.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl_seconds: float = 3600,
+        semantic_threshold: float = 0.95,
+        semantic_max_size: int | None = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_size = semantic_max_size if semantic_max_size is not None else max_size
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._exact: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # Semantic tier: row `slot` of `_vectors` is live while `slot` is in `_slots`
+        self._vectors: np.ndarray | None = None
+        self._expires = np.zeros(self.semantic_max_size, dtype=np.float64)
+        self._slots: OrderedDict[int, str] = OrderedDict()
+        self._free: list[int] = list(range(self.semantic_max_size - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def get_exact(self, text: str) -> str | None:
+        key = normalize_text(text)
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is None:
+                return None
+            expires_at, label = entry
+            if expires_at <= time.monotonic():
+                del self._exact[key]
+                return None
+            self._exact.move_to_end(key)
+            self.hits["exact"] += 1
+            return label
+
+    def get_similar(self, embedding: Sequence[float]) -> str | None:
+        query = normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            if self._vectors is None or not self._slots:
+                self.misses += 1
+                return None
+            slots = np.fromiter(self._slots.keys(), dtype=np.int64, count=len(self._slots))
+            live = self._expires[slots] > time.monotonic()
+            if not live.all():
+                for slot in slots[~live]:
+                    self._release(int(slot))
+                slots = slots[live]
+            if len(slots) == 0:
+                self.misses += 1
+                return None
+
+            scores = self._vectors[slots] @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.semantic_threshold:
+                self.misses += 1
+                return None
+            slot = int(slots[best])
+            self._slots.move_to_end(slot)
+            self.hits["semantic"] += 1
+            return self._slots[slot]
+
+    def put(self, text: str, embedding: Sequence[float] | None, label: str) -> None:
+        expires_at = time.monotonic() + self.ttl
+        key = normalize_text(text)
+        with self._lock:
+            self._exact[key] = (expires_at, label)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_size:
+                self._exact.popitem(last=False)
+
+            if embedding is None or self.semantic_max_size <= 0:
+                return
+            vector = normalize(np.asarray(embedding, dtype=np.float32))
+            if self._vectors is None:
+                self._vectors = np.zeros((self.semantic_max_size, vector.shape[0]), dtype=np.float32)
+            if not self._free:
+                self._release(next(iter(self._slots)))
+            slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._expires[slot] = expires_at
+            self._slots[slot] = label
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            for slot in list(self._slots):
+                self._release(slot)
+
+    def _release(self, slot: int) -> None:
+        del self._slots[slot]
+        self._free.append(slot)
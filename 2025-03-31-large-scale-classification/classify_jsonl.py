@@ -0,0 +1,123 @@
+"""Classify a JSONL stream: one {"text": ...} object per input line, same object plus
+"category" (or "error") per output line, in input order. A line that is not a JSON
+object becomes {"line": <line number>, "error": ...} in its place.
+
+    uv run classify_jsonl.py < messages.jsonl > labeled.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import deque
+from typing import Any, Dict, TextIO
+
+from hello import classify_batch
+
+# Roughly how many bytes to pull from the input per read
+READ_HINT = 1 << 16
+
+
+async def classify_stream(
+    input: TextIO,
+    output: TextIO,
+    text_field: str = "text",
+    batch_size: int = 256,
+    max_concurrency: int = 16,
+    max_pending: int = 4096,
+) -> None:
+    loop = asyncio.get_running_loop()
+    llm_slots = asyncio.Semaphore(max_concurrency)
+    pending: deque[tuple[Dict[str, Any], asyncio.Future[str]]] = deque()
+
+    def failed(e: Exception) -> asyncio.Future[str]:
+        future: asyncio.Future[str] = loop.create_future()
+        future.set_exception(e)
+        return future
+
+    def write_ready(_: Any = None) -> None:
+        # Write finished results from the head of the queue, so output order always
+        # matches input; runs as each result completes, not only when input arrives
+        wrote = False
+        while pending and pending[0][1].done():
+            record, future = pending.popleft()
+            try:
+                record["category"] = future.result()
+            except Exception as e:
+                record["error"] = str(e)
+            output.write(json.dumps(record) + "\n")
+            wrote = True
+        if wrote:
+            output.flush()
+
+    async def drain(keep: int) -> None:
+        # Wait on the head only while more than `keep` records are buffered
+        while len(pending) > keep:
+            await asyncio.wait([pending[0][1]])
+            write_ready()
+
+    async def submit(records: list[tuple[Dict[str, Any], Exception | None]]) -> None:
+        texts = [record[text_field] for record, error in records if error is None]
+        try:
+            futures = await classify_batch(texts, llm_slots) if texts else []
+        except Exception as e:
+            # A failed embedding request marks its batch as errored instead of ending the stream
+            futures = [failed(e) for _ in texts]
+        results = iter(futures)
+        for record, error in records:
+            future = failed(error) if error is not None else next(results)
+            pending.append((record, future))
+            future.add_done_callback(write_ready)
+        write_ready()
+        await drain(max_pending)
+
+    def parse(line: str, line_number: int) -> tuple[Dict[str, Any], Exception | None]:
+        # Bad lines still get an output line in their place, so the run never stops on one
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            return {"line": line_number}, ValueError(f"invalid JSON: {e}")
+        if not isinstance(record, dict):
+            return {"line": line_number}, ValueError(f"expected a JSON object, got {type(record).__name__}")
+        if not isinstance(record.get(text_field), str):
+            return record, ValueError(f"missing string field '{text_field}'")
+        return record, None
+
+    batch: list[tuple[Dict[str, Any], Exception | None]] = []
+    line_number = 0
+    while lines := await asyncio.to_thread(input.readlines, READ_HINT):
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            batch.append(parse(line, line_number))
+            if len(batch) >= batch_size:
+                await submit(batch)
+                batch = []
+    if batch:
+        await submit(batch)
+    await drain(0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", type=argparse.FileType("r"), default=sys.stdin)
+    parser.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout)
+    parser.add_argument("--field", default="text", help="input field holding the text to classify")
+    parser.add_argument("--batch-size", type=int, default=256, help="texts embedded and narrowed together")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="LLM picks in flight at once")
+    parser.add_argument("--max-pending", type=int, default=4096, help="records buffered before waiting on output")
+    args = parser.parse_args()
+
+    asyncio.run(classify_stream(
+        args.input,
+        args.output,
+        text_field=args.field,
+        batch_size=args.batch_size,
+        max_concurrency=args.max_concurrency,
+        max_pending=args.max_pending,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,98 +1,205 @@
+import asyncio
+import functools
+from pathlib import Path
+
 import dotenv
 import openai
-import numpy as np
+from category_index import CategoryIndex, HierarchicalIndex
+from classification_cache import ClassificationCache
+from embedding_client import BatchingEmbeddingClient, iter_batches
 from baml_client import b
+from baml_client.async_client import b as async_b
 from baml_client.type_builder import TypeBuilder
 from baml_client.tracing import trace
 from pydantic import BaseModel
 
 dotenv.load_dotenv()
 client = openai.OpenAI()
+async_client = openai.AsyncOpenAI()
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Narrowing keeps the best MAX_MATCHES categories from the best MAX_GROUPS groups
+MAX_GROUPS = 2
+MAX_MATCHES = 5
+async_embedder = BatchingEmbeddingClient(async_client, model=EMBEDDING_MODEL)
+category_index = CategoryIndex(Path(__file__).parent / ".category_index", EMBEDDING_MODEL)
+# Repeated or near-identical messages skip the embedding narrowing and the LLM pick
+classification_cache = ClassificationCache(max_size=10_000, ttl_seconds=3600, semantic_threshold=0.95)
 
 
 class Category(BaseModel):
     name: str
+    # Parent group, used to narrow down groups before individual categories
+    group: str
     embedding_text: str
     llm_description: str
 
 
 def load_categories() -> list[Category]:
     return [
-        Category(name="Search Products", embedding_text="Find products", llm_description="User is looking to search for products"),
-        Category(name="Buy Product", embedding_text="do something with money", llm_description="User is looking to buy a product"),
-        Category(name="View Product Details", embedding_text="Product details", llm_description="User wants to view detailed information about a product"),
-        Category(name="Add to Cart", embedding_text="Add item to cart", llm_description="User intends to add a product to their shopping cart"),
-        Category(name="Checkout", embedding_text="Proceed to checkout", llm_description="User is ready to purchase and wants to checkout"),
-        Category(name="Apply Discount Code", embedding_text="Use discount code", llm_description="User wants to apply a discount code to their purchase"),
-        Category(name="Track Order", embedding_text="Order tracking", llm_description="User wants to track the status of their order"),
-        Category(name="Return Item", embedding_text="Return product", llm_description="User wants to return a purchased item"),
-        Category(name="Contact Support", embedding_text="Customer support", llm_description="User needs assistance from customer support"),
-        Category(name="Read Reviews", embedding_text="Product reviews", llm_description="User wants to read reviews about a product"),
-        Category(name="Compare Products", embedding_text="Compare items", llm_description="User is comparing different products"),
-        Category(name="View Wishlist", embedding_text="Wishlist", llm_description="User wants to view their wishlist"),
-        Category(name="Search Deals", embedding_text="Find deals", llm_description="User is looking for deals or discounts"),
-        Category(name="Sign Up", embedding_text="Create account", llm_description="User wants to sign up for an account"),
-        Category(name="Login", embedding_text="User login", llm_description="User wants to log into their account"),
-        Category(name="Logout", embedding_text="User logout", llm_description="User wants to log out of their account")
+        Category(name="Search Products", group="Browse", embedding_text="Find products", llm_description="User is looking to search for products"),
+        Category(name="Buy Product", group="Purchase", embedding_text="do something with money", llm_description="User is looking to buy a product"),
+        Category(name="View Product Details", group="Browse", embedding_text="Product details", llm_description="User wants to view detailed information about a product"),
+        Category(name="Add to Cart", group="Purchase", embedding_text="Add item to cart", llm_description="User intends to add a product to their shopping cart"),
+        Category(name="Checkout", group="Purchase", embedding_text="Proceed to checkout", llm_description="User is ready to purchase and wants to checkout"),
+        Category(name="Apply Discount Code", group="Purchase", embedding_text="Use discount code", llm_description="User wants to apply a discount code to their purchase"),
+        Category(name="Track Order", group="Orders", embedding_text="Order tracking", llm_description="User wants to track the status of their order"),
+        Category(name="Return Item", group="Orders", embedding_text="Return product", llm_description="User wants to return a purchased item"),
+        Category(name="Contact Support", group="Orders", embedding_text="Customer support", llm_description="User needs assistance from customer support"),
+        Category(name="Read Reviews", group="Browse", embedding_text="Product reviews", llm_description="User wants to read reviews about a product"),
+        Category(name="Compare Products", group="Browse", embedding_text="Compare items", llm_description="User is comparing different products"),
+        Category(name="View Wishlist", group="Purchase", embedding_text="Wishlist", llm_description="User wants to view their wishlist"),
+        Category(name="Search Deals", group="Browse", embedding_text="Find deals", llm_description="User is looking for deals or discounts"),
+        Category(name="Sign Up", group="Account", embedding_text="Create account", llm_description="User wants to sign up for an account"),
+        Category(name="Login", group="Account", embedding_text="User login", llm_description="User wants to log into their account"),
+        Category(name="Logout", group="Account", embedding_text="User logout", llm_description="User wants to log out of their account")
     ]
 
 def embed(text: str) -> list[float]:
     response = client.embeddings.create(
-        model="text-embedding-3-small",
+        model=EMBEDDING_MODEL,
         input=text,
     )
     return response.data[0].embedding
 
+def embed_many(texts: list[str]) -> list[list[float]]:
+    embeddings: list[list[float]] = []
+    for batch in iter_batches(texts):
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=batch,
+        )
+        embeddings.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+    return embeddings
+
+def _category_hierarchy(categories: list[Category]) -> HierarchicalIndex:
+    # Category embeddings come from the on-disk index, only queries hit the API
+    return category_index.hierarchical_index(
+        [category.embedding_text for category in categories],
+        [category.group for category in categories],
+        embed_many,
+    )
+
 @trace
-def _narrow_down_categories(text: str, categories: list[Category]) -> list[Category]:
-    embeddings: list[tuple[Category, list[float]]] = []
-    for category in categories:
-        embeddings.append((category, embed(category.embedding_text)))
-    text_embedding = embed(text)
-    best_matches: list[tuple[Category, float]] = []
-    for category, embedding in embeddings:
-        cosine_similarity = np.dot(text_embedding, embedding) / (np.linalg.norm(text_embedding) * np.linalg.norm(embedding))
-        best_matches.append((category, cosine_similarity))
-    max_matches = 5
-    matches = sorted(best_matches, key=lambda x: x[1], reverse=True)[:max_matches]
-    return [match[0] for match in matches]
+def _narrow_down_categories(text: str, categories: list[Category], text_embedding: list[float] | None = None) -> list[Category]:
+    index = _category_hierarchy(categories)
+    if text_embedding is None:
+        text_embedding = embed(text)
+    # Pick the closest groups first, then only compare against the categories inside them
+    return [categories[row] for row, _ in index.top_k(text_embedding, MAX_MATCHES, MAX_GROUPS)]
 
-def _narrow_down_categories_llm(text: str, categories: list[Category]) -> list[Category]:
+@functools.lru_cache(maxsize=1024)
+def _type_builder_for(candidates: tuple[tuple[str, str], ...]) -> TypeBuilder:
     tb = TypeBuilder()
-    for i, category in enumerate(categories):
-        val = tb.Category.add_value(category.name)
+    # Candidates stay in rank order, best match first, as the prompt has always listed them
+    for i, (name, llm_description) in enumerate(candidates):
+        val = tb.Category.add_value(name)
         val.alias(f"k{i}")
-        val.description(category.llm_description)
+        val.description(llm_description)
+    return tb
+
+def _category_type_builder(categories: list[Category]) -> TypeBuilder:
+    # Narrowing keeps producing the same few ranked candidate lists, so reuse their prepared builders
+    return _type_builder_for(tuple((category.name, category.llm_description) for category in categories))
+
+def _narrow_down_categories_llm(text: str, categories: list[Category]) -> list[Category]:
+    tb = _category_type_builder(categories)
     selected_categories = b.PickBestCategories(text, count=3, baml_options={ "tb": tb })
     return [category for category in categories if category.name in selected_categories]
 
 
-def _pick_best_category(text: str, categories: list[Category]) -> Category:
-    tb = TypeBuilder()
-    for i, category in enumerate(categories):
-        val = tb.Category.add_value(category.name)
-        val.alias(f"k{i}")
-        val.description(category.llm_description)
-
-    selected_category = b.PickBestCategory(text, { "tb": tb })
+def _find_category(categories: list[Category], selected_category: str) -> Category:
     for category in categories:
         if category.name == selected_category:
             return category
     # IMPOSSIBLE TO HAPPEN THANKS TO BAML!
     raise ValueError(f"Selected category {selected_category} not found in categories")
 
+def _pick_best_category(text: str, categories: list[Category]) -> Category:
+    tb = _category_type_builder(categories)
+    selected_category = b.PickBestCategory(text, { "tb": tb })
+    return _find_category(categories, selected_category)
+
+async def _pick_best_category_async(text: str, categories: list[Category]) -> Category:
+    tb = _category_type_builder(categories)
+    selected_category = await async_b.PickBestCategory(text, { "tb": tb })
+    return _find_category(categories, selected_category)
+
 @trace
 def pick_category(text: str) -> str:
     use_llm_to_narrow_down_categories = False
 
     categories = load_categories()
-    narrowed_down_categories = _narrow_down_categories(text, categories)
+    category_names = {category.name for category in categories}
+    # Cached labels for categories that have since been removed are treated as misses
+    if (cached := classification_cache.get_exact(text)) in category_names:
+        return cached
+    text_embedding = embed(text)
+    if (cached := classification_cache.get_similar(text_embedding)) in category_names:
+        classification_cache.put(text, None, cached)
+        return cached
+
+    narrowed_down_categories = _narrow_down_categories(text, categories, text_embedding)
     if use_llm_to_narrow_down_categories:
-        narrowed_down_categories_llm = _narrow_down_categories_llm(text, categories)
+        narrowed_down_categories_llm = _narrow_down_categories_llm(text, narrowed_down_categories)
         narrowed_down_categories = narrowed_down_categories_llm
     category = _pick_best_category(text, narrowed_down_categories)
+    classification_cache.put(text, text_embedding, category.name)
+    return category.name
+
+
+async def _pick_and_cache(text: str, text_embedding: list[float], categories: list[Category], llm_slots: asyncio.Semaphore) -> str:
+    async with llm_slots:
+        category = await _pick_best_category_async(text, categories)
+    classification_cache.put(text, text_embedding, category.name)
     return category.name
 
+async def classify_batch(texts: list[str], llm_slots: asyncio.Semaphore) -> list[asyncio.Future[str]]:
+    """Start classifying a batch of texts and return one future per text, in input order.
+
+    Cache lookups, embeddings and narrowing run for the whole batch at once (batched
+    embedding requests, one matrix product over the category groups). Only the LLM picks
+    run per text, at most `llm_slots` at a time across every batch sharing the semaphore.
+    """
+    loop = asyncio.get_running_loop()
+    categories = load_categories()
+    category_names = {category.name for category in categories}
+    results: dict[int, asyncio.Future[str]] = {}
+
+    def resolved(name: str) -> asyncio.Future[str]:
+        future: asyncio.Future[str] = loop.create_future()
+        future.set_result(name)
+        return future
+
+    pending: list[int] = []
+    for i, text in enumerate(texts):
+        if (cached := classification_cache.get_exact(text)) in category_names:
+            results[i] = resolved(cached)
+        else:
+            pending.append(i)
+
+    misses: list[tuple[int, list[float]]] = []
+    embeddings = await async_embedder.embed_many([texts[i] for i in pending]) if pending else []
+    for i, text_embedding in zip(pending, embeddings):
+        if (cached := classification_cache.get_similar(text_embedding)) in category_names:
+            classification_cache.put(texts[i], None, cached)
+            results[i] = resolved(cached)
+        else:
+            misses.append((i, text_embedding))
+
+    if misses:
+        # Building the index may embed new categories with the sync client, keep it off the loop
+        index = await asyncio.to_thread(_category_hierarchy, categories)
+        narrowed = index.top_k_batch([text_embedding for _, text_embedding in misses], MAX_MATCHES, MAX_GROUPS)
+        for (i, text_embedding), hits in zip(misses, narrowed):
+            candidates = [categories[row] for row, _ in hits]
+            results[i] = asyncio.ensure_future(_pick_and_cache(texts[i], text_embedding, candidates, llm_slots))
+    return [results[i] for i in range(len(texts))]
+
+async def pick_categories(texts: list[str], max_concurrency: int = 16) -> list[str]:
+    llm_slots = asyncio.Semaphore(max_concurrency)
+    return list(await asyncio.gather(*await classify_batch(texts, llm_slots)))
+
 
 if __name__ == "__main__":
     print(pick_category("I want to buy a new phone"))
@@ -0,0 +1,230 @@
+"""Offline benchmark for the tool routing path in tools.py.
+
+Generates synthetic catalogs in the tools.json shape, swaps the OpenAI embedder for a
+deterministic local one, and reports catalog compile time, index build time, per-query
+latency, peak RSS and recall@k against brute-force cosine search over the whole catalog.
+Every size runs in a fresh process so peak RSS is per size.
+
+    uv run bench_routing.py --sizes 100 1000 10000 100000 --queries 200
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+import numpy as np
+from lexical_index import tokenize
+
+# tools.py builds an OpenAI client at import time; nothing here talks to the network
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+EMBEDDING_DIM = 256
+TOOLS_PER_SERVER = 8
+
+VERBS = ["get", "list", "create", "update", "delete", "search", "run", "send", "fetch", "sync",
+         "export", "import", "archive", "approve", "schedule", "summarize"]
+NOUNS = ["page", "database", "issue", "message", "file", "user", "invoice", "event", "ticket",
+         "repository", "branch", "comment", "dashboard", "report", "contact", "deployment",
+         "calendar", "folder", "payment", "channel"]
+DOMAINS = ["notion", "github", "slack", "stripe", "jira", "linear", "gmail", "drive", "hubspot",
+           "vercel", "sentry", "zendesk", "figma", "airtable", "postgres", "datadog"]
+FILLER = ["please", "can", "you", "the", "for", "me", "my", "from", "all", "some", "quickly"]
+
+
+class FakeEmbedder:
+    """Hashed bag-of-words embeddings: deterministic, offline, and similar for similar text."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.request_count = 0
+        self.text_count = 0
+
+    def vector(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        return vector.tolist()
+
+    async def embed(self, text: str) -> list[float]:
+        self.request_count += 1
+        return self.vector(text)
+
+    async def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        self.request_count += 1
+        self.text_count += len(texts)
+        return [self.vector(text) for text in texts]
+
+
+def synthetic_catalog(num_tools: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    servers: Dict[str, list[Dict[str, Any]]] = {}
+    for tool_id in range(num_tools):
+        server_id = tool_id // TOOLS_PER_SERVER
+        domain = DOMAINS[server_id % len(DOMAINS)]
+        server = f"{domain}-{server_id}"
+        verb, noun = rng.choice(VERBS), rng.choice(NOUNS)
+        properties: Dict[str, Any] = {
+            f"{noun}_id": {"type": "string", "description": f"Identifier of the {noun}"},
+            "limit": {"type": "integer", "description": "Maximum number of results"},
+        }
+        schema: Dict[str, Any] = {"type": "object", "properties": properties, "required": [f"{noun}_id"]}
+        if tool_id % 5 == 0:
+            # Exercise $ref resolution on a slice of the catalog
+            properties["filter"] = {"$ref": "#/$defs/Filter"}
+            schema["$defs"] = {
+                "Filter": {
+                    "type": "object",
+                    "title": f"Filter_{tool_id}",
+                    "properties": {"field": {"type": "string"}, "value": {"type": "string"}},
+                },
+            }
+        servers.setdefault(server, []).append({
+            "name": f"{verb}_{noun}_{tool_id}",
+            "description": f"{verb.capitalize()} a {noun} in {domain}. Works with {rng.choice(NOUNS)} data.",
+            "inputSchema": schema,
+        })
+    return {"servers": servers}
+
+
+def synthetic_queries(data: Dict[str, Any], count: int, seed: int) -> list[str]:
+    rng = random.Random(seed + 1)
+    tools = [tool for server_tools in data["servers"].values() for tool in server_tools]
+    queries = []
+    for _ in range(count):
+        tool = rng.choice(tools)
+        words = tool["description"].rstrip(".").split()[:5] + rng.sample(FILLER, 3)
+        rng.shuffle(words)
+        queries.append(" ".join(words))
+    return queries
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    return float(np.percentile(np.asarray(samples), pct)) if samples else 0.0
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+async def _bench_size(num_tools: int, num_queries: int, k: int, seed: int) -> Dict[str, Any]:
+    import tool_catalog
+    import tools
+    from similarity import SimilarityIndex
+    from tool_catalog import load_catalog
+    from tool_index import ShardedToolIndex
+
+    embedder = FakeEmbedder()
+    tools.embedder = embedder  # type: ignore[assignment]
+    tools.tool_index = ShardedToolIndex(tools.tool_embedding_text)
+    tools.lexical_index.cache_clear()
+
+    data = synthetic_catalog(num_tools, seed)
+    queries = synthetic_queries(data, num_queries, seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tool_file = Path(tmp) / "tools.json"
+        tool_file.write_text(json.dumps(data))
+        cache_dir = Path(tmp) / "catalog"
+
+        # Cold load: hash, parse and validate every schema, write the compiled pickle
+        start = time.perf_counter()
+        load_catalog(str(tool_file), cache_dir=cache_dir)
+        parse_s = time.perf_counter() - start
+
+        # Warm load from the pickle, as a restarted process would see it
+        tool_catalog._loaded.clear()
+        start = time.perf_counter()
+        catalog = load_catalog(str(tool_file), cache_dir=cache_dir)
+        cached_load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tools.lexical_index(catalog)
+    lexical_build_s = time.perf_counter() - start
+
+    # Cold first turn: the index only embeds that turn's candidates
+    if queries:
+        await tools._narrow_down_categories(queries[0], catalog, tools.narrow_tools(queries[0], catalog))
+    cold_turn_embeds = embedder.text_count
+
+    start = time.perf_counter()
+    await tools.tool_index.sync(catalog.servers, embedder.embed_many)
+    vector_build_s = time.perf_counter() - start
+
+    # Brute-force baseline: exact cosine search over every tool in the catalog
+    baseline = SimilarityIndex([embedder.vector(tools.tool_embedding_text(tool)) for tool in catalog.tools])
+
+    latencies: list[float] = []
+    recalls: list[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        candidates = tools.narrow_tools(query, catalog)
+        selected = await tools._narrow_down_categories(query, catalog, candidates)
+        latencies.append(time.perf_counter() - start)
+
+        expected = {catalog.tools[row].name for row, _ in baseline.top_k(embedder.vector(query), k)}
+        routed = {tool.name for tool in selected[:k]}
+        recalls.append(len(expected & routed) / max(1, len(expected)))
+
+    return {
+        "tools": num_tools,
+        "catalog_tools": len(catalog),
+        "parse_s": parse_s,
+        "cached_load_s": cached_load_s,
+        "lexical_build_s": lexical_build_s,
+        "cold_turn_embeds": cold_turn_embeds,
+        "vector_build_s": vector_build_s,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        f"recall@{k}": float(np.mean(recalls)) if recalls else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_size(num_tools: int, num_queries: int, k: int, seed: int) -> Dict[str, Any]:
+    return asyncio.run(_bench_size(num_tools, num_queries, k, seed))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per size")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        # A fresh process per size keeps peak RSS and module-level caches independent
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(bench_size, size, args.queries, args.k, args.seed).result()
+        results.append(result)
+        if args.json:
+            print(json.dumps(result))
+
+    if not args.json:
+        columns = list(results[0].keys())
+        print("  ".join(f"{column:>15}" for column in columns))
+        for result in results:
+            print("  ".join(
+                f"{value:>15.4f}" if isinstance(value, float) else f"{value:>15}"
+                for value in result.values()
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# Copy of ../2025-03-31-large-scale-classification/embedding_client.py. Each episode directory is a
+# standalone uv project, so it is copied rather than imported; keep the two in sync.
+import asyncio
+import weakref
+from typing import Iterator, Sequence
+
+import openai
+
+# The embeddings endpoint accepts at most 2048 inputs and ~300k tokens per request
+MAX_BATCH_SIZE = 2048
+MAX_BATCH_TOKENS = 300_000
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting and avoids a tiktoken dependency
+    return len(text) // 4 + 1
+
+
+def iter_batches(
+    texts: Sequence[str],
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_batch_tokens: int = MAX_BATCH_TOKENS,
+) -> Iterator[list[str]]:
+    """Split `texts` into consecutive batches that respect both the size and token caps.
+
+    A single text that is over the token budget on its own still gets a batch of one.
+    """
+    batch: list[str] = []
+    batch_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_batch_size or batch_tokens + tokens > max_batch_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+class _LoopState:
+    """Batching state for one event loop; asyncio primitives cannot cross loops."""
+
+    def __init__(self, max_in_flight: int):
+        self.pending: dict[str, list[asyncio.Future[list[float]]]] = {}
+        self.pending_tokens = 0
+        self.flush_handle: asyncio.TimerHandle | None = None
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.requests: set[asyncio.Task[None]] = set()
+
+
+class BatchingEmbeddingClient:
+    """Coalesces concurrent `embed()` calls into batched embedding requests.
+
+    Calls made within `linger_ms` of each other are sent together (identical texts share
+    one slot), a batch is flushed early once it reaches `max_batch_size` or
+    `max_batch_tokens`, and at most `max_in_flight` requests are outstanding at once.
+    Each event loop that uses the client gets its own batches and in-flight limit, so a
+    module-level instance works across repeated `asyncio.run` calls.
+    """
+
+    def __init__(
+        self,
+        client: openai.AsyncOpenAI,
+        model: str = "text-embedding-3-small",
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_in_flight: int = 4,
+        linger_ms: float = 5.0,
+    ):
+        self.client = client
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_in_flight = max_in_flight
+        self.linger = linger_ms / 1000
+        self.request_count = 0
+
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _state(self, loop: asyncio.AbstractEventLoop) -> _LoopState:
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self.max_in_flight)
+        return state
+
+    async def embed(self, text: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        state = self._state(loop)
+        future: asyncio.Future[list[float]] = loop.create_future()
+
+        if text in state.pending:
+            state.pending[text].append(future)
+            return await future
+
+        tokens = estimate_tokens(text)
+        if state.pending and state.pending_tokens + tokens > self.max_batch_tokens:
+            self._flush(state)
+        state.pending[text] = [future]
+        state.pending_tokens += tokens
+
+        if len(state.pending) >= self.max_batch_size:
+            self._flush(state)
+        elif state.flush_handle is None:
+            state.flush_handle = loop.call_later(self.linger, self._flush, state)
+        return await future
+
+    async def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def _flush(self, state: _LoopState) -> None:
+        if state.flush_handle is not None:
+            state.flush_handle.cancel()
+            state.flush_handle = None
+        if not state.pending:
+            return
+        batch = state.pending
+        state.pending = {}
+        state.pending_tokens = 0
+        # Keep a reference so the request task is not garbage collected mid-flight
+        task = asyncio.create_task(self._send(state, batch))
+        state.requests.add(task)
+        task.add_done_callback(state.requests.discard)
+
+    async def _send(self, state: _LoopState, batch: dict[str, list[asyncio.Future[list[float]]]]) -> None:
+        texts = list(batch.keys())
+        # Every path out of here must settle the callers' futures, or they wait forever
+        try:
+            async with state.semaphore:
+                self.request_count += 1
+                response = await self.client.embeddings.create(model=self.model, input=texts)
+            for item in response.data:
+                for future in batch[texts[item.index]]:
+                    # Callers that were cancelled while waiting just drop their result
+                    if not future.done():
+                        future.set_result(item.embedding)
+            error: BaseException = RuntimeError("Embedding response is missing an input")
+        except asyncio.CancelledError:
+            self._fail(batch, None)
+            raise
+        except Exception as e:
+            error = e
+        self._fail(batch, error)
+
+    @staticmethod
+    def _fail(batch: dict[str, list[asyncio.Future[list[float]]]], error: BaseException | None) -> None:
+        """Settle every unfinished future in `batch` with `error`, or cancel it if None."""
+        for futures in batch.values():
+            for future in futures:
+                if future.done():
+                    continue
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
@@ -0,0 +1,65 @@
+import math
+import re
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+from similarity import top_k_indices
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+CAMEL_CASE_RE = re.compile(r"([a-z0-9])([A-Z])")
+
+
+def tokenize(text: str) -> list[str]:
+    # "listPages" / "list_pages" / "list-pages" all become ["list", "pages"]
+    return TOKEN_RE.findall(CAMEL_CASE_RE.sub(r"\1 \2", text).lower())
+
+
+class BM25Index:
+    """In-memory inverted index scored with Okapi BM25.
+
+    Postings are stored as numpy arrays per term, so a query only touches the documents
+    that contain one of its terms.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+
+        postings: dict[str, tuple[list[int], list[int]]] = {}
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for doc_id, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                ids, tfs = postings.setdefault(term, ([], []))
+                ids.append(doc_id)
+                tfs.append(tf)
+
+        avg_length = float(lengths.mean()) if self.size else 0.0
+        self._length_norm = k1 * (1 - b + b * lengths / max(avg_length, 1e-9))
+        self._postings = {
+            term: (np.asarray(ids, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+            for term, (ids, tfs) in postings.items()
+        }
+        self._idf = {
+            term: math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            for term, (ids, _) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Return `(doc_id, score)` for the `k` best documents sharing a term with `query`."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            ids, tfs = self._postings[term]
+            scores[ids] += self._idf[term] * tfs * (self.k1 + 1) / (tfs + self._length_norm[ids])
+
+        hits = np.flatnonzero(scores)
+        hit_scores = scores[hits]
+        return [(int(hits[i]), float(hit_scores[i])) for i in top_k_indices(hit_scores, k)]
@@ -1,10 +1,14 @@
+import copy
 import warnings
 import json
-from typing import Any, Dict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator
 from baml_client.type_builder import TypeBuilder, FieldType
 
 TOOL_NAME_KEY = "$baml_tool_name$"
 TOOL_NAME_LLM_FIELD = "function_name"
+# Top-level schema sections that hold `$ref` targets rather than the schema itself
+DEFINITION_KEYS = ("$defs", "definitions")
 
 class SchemaAdder:
     def __init__(self, tb: TypeBuilder, schema: Dict[str, Any]):
@@ -126,28 +130,109 @@ def parse_json_schema(json_schema: Dict[str, Any], tb: TypeBuilder) -> FieldType
     parser = SchemaAdder(tb, json_schema)
     return parser.parse(json_schema)
 
-def parse_tools(scheme_file_path: str, tb: TypeBuilder) -> Dict[str, tuple[FieldType, Dict[str, Any]]]:
-    with open(scheme_file_path, "r") as f:
-        schema = json.load(f)
-    loaded_tools = {}
+def tool_name(server: str, tool: Dict[str, Any]) -> str:
+    return f"{server}/{tool['name']}"
+
+def normalize_tool_schema(server: str, tool: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Return a copy of the tool's input schema ready for `parse_json_schema`.
+
+    The copy is titled `server/tool` and gets a required tool-name enum so the LLM output
+    says which tool it picked. Tools without properties return None and are skipped.
+    """
+    input_schema = copy.deepcopy(tool["inputSchema"])
+    name = tool_name(server, tool)
+    input_schema["title"] = name
+    if "properties" not in input_schema:
+        return None
+    input_schema["properties"][TOOL_NAME_KEY] = {
+        "type": "string",
+        "enum": [name],
+        "description": tool.get("description", None),
+    }
+    # make properties.tool_name required
+    if "required" not in input_schema:
+        input_schema["required"] = []
+    input_schema["required"].append(TOOL_NAME_KEY)
+    return input_schema
+
+def _iter_refs(node: Any) -> Iterator[str]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "$ref" and isinstance(value, str):
+                yield value
+            else:
+                yield from _iter_refs(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _iter_refs(item)
+
+def ref_closure(json_schema: Dict[str, Any]) -> set[str]:
+    """Every local `$ref` reachable from the schema body, following refs transitively."""
+    body = {key: value for key, value in json_schema.items() if key not in DEFINITION_KEYS}
+    seen: set[str] = set()
+    stack = list(_iter_refs(body))
+    while stack:
+        ref = stack.pop()
+        if ref in seen or not ref.startswith("#/"):
+            continue
+        seen.add(ref)
+        _, left, right = ref.split("/", 2)
+        definitions = json_schema.get(left)
+        if isinstance(definitions, dict) and right in definitions:
+            stack.extend(_iter_refs(definitions[right]))
+    return seen
+
+def prune_definitions(json_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop `$defs`/`definitions` entries the schema never references."""
+    closure = ref_closure(json_schema)
+    for key in DEFINITION_KEYS:
+        definitions = json_schema.get(key)
+        if not isinstance(definitions, dict):
+            continue
+        kept = {name: value for name, value in definitions.items() if f"#/{key}/{name}" in closure}
+        if kept:
+            json_schema[key] = kept
+        else:
+            del json_schema[key]
+    return json_schema
+
+@dataclass(frozen=True)
+class LazyTool:
+    """A tool indexed by name and normalized schema, not yet added to any TypeBuilder."""
+    name: str
+    server: str
+    tool: Dict[str, Any]
+    schema: Dict[str, Any]
+
+    def materialize(self, tb: TypeBuilder) -> FieldType:
+        # parse_json_schema pops keys out of the schema it is given, keep ours intact
+        return parse_json_schema(copy.deepcopy(self.schema), tb)
+
+def index_tools(schema: Dict[str, Any]) -> Dict[str, LazyTool]:
+    """Index every tool in a tools.json document without touching a TypeBuilder.
+
+    Each schema only keeps the definitions in its transitive `$ref` closure, so
+    materializing a tool later registers nothing it does not use.
+    """
+    indexed = {}
     for server, tools in schema["servers"].items():
         for tool in tools:
-            input_schema = tool["inputSchema"]
-            input_schema["title"] = f"{server}/{tool['name']}"
-            if "properties" in input_schema:
-                input_schema["properties"][TOOL_NAME_KEY] = {
-                    "type": "string",
-                    "enum": [f"{server}/{tool['name']}"],
-                    "description": tool.get("description", None),
-                }
-                # make properties.tool_name required
-                if "required" not in input_schema:
-                    input_schema["required"] = []
-                input_schema["required"].append(TOOL_NAME_KEY)
-                try:
-                    tp = parse_json_schema(input_schema, tb)
-                    loaded_tools[f"{server}/{tool['name']}"] = (tp, tool)
-                except Exception as e:
-                    pass
+            input_schema = normalize_tool_schema(server, tool)
+            if input_schema is not None:
+                name = tool_name(server, tool)
+                indexed[name] = LazyTool(name, server, tool, prune_definitions(input_schema))
+    return indexed
+
+def materialize_tools(tb: TypeBuilder, tools: Iterable[LazyTool]) -> Dict[str, tuple[FieldType, Dict[str, Any]]]:
+    loaded_tools = {}
+    for tool in tools:
+        try:
+            loaded_tools[tool.name] = (tool.materialize(tb), tool.tool)
+        except Exception as e:
+            pass
     return loaded_tools
 
+def parse_tools(scheme_file_path: str, tb: TypeBuilder) -> Dict[str, tuple[FieldType, Dict[str, Any]]]:
+    with open(scheme_file_path, "r") as f:
+        schema = json.load(f)
+    return materialize_tools(tb, index_tools(schema).values())
@@ -0,0 +1,65 @@
+# Copy of ../2025-03-31-large-scale-classification/similarity.py. Each episode directory is a
+# standalone uv project, so it is copied rather than imported; keep the two in sync.
+from typing import Sequence
+
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize along the last axis, leaving all-zero vectors as zeros."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores along the last axis, best first."""
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+class SimilarityIndex:
+    """Cosine similarity search over a fixed set of embeddings.
+
+    Embeddings are normalized once into a single float32 matrix, so scoring a query is
+    one matrix-vector product and selecting results is an `argpartition` rather than a
+    full sort.
+    """
+
+    def __init__(self, embeddings: np.ndarray | Sequence[Sequence[float]]):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError(f"Expected a 2D embedding matrix, got shape {matrix.shape}")
+        self.matrix = normalize(matrix)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def scores(self, query: np.ndarray | Sequence[float]) -> np.ndarray:
+        return self.matrix @ normalize(np.asarray(query, dtype=np.float32))
+
+    def top_k(self, query: np.ndarray | Sequence[float], k: int) -> list[tuple[int, float]]:
+        """Return `(row, cosine_similarity)` pairs for the `k` closest rows, best first."""
+        scores = self.scores(query)
+        return [(int(i), float(scores[i])) for i in top_k_indices(scores, k)]
+
+    def top_k_batch(
+        self, queries: np.ndarray | Sequence[Sequence[float]], k: int
+    ) -> list[list[tuple[int, float]]]:
+        """Score a batch of queries with a single matrix-matrix product."""
+        queries = normalize(np.asarray(queries, dtype=np.float32))
+        scores = queries @ self.matrix.T
+        indices = top_k_indices(scores, k)
+        return [
+            [(int(i), float(row_scores[i])) for i in row_indices]
+            for row_scores, row_indices in zip(scores, indices)
+        ]
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from baml_client.type_builder import TypeBuilder, FieldType
+from parse_json_schema import LazyTool, index_tools, materialize_tools
+
+# Bump when the compiled layout changes so stale cache files are ignored
+CATALOG_VERSION = 2
+CATALOG_DIR = Path(__file__).parent / ".tool_catalog"
+
+
+class ToolCatalog:
+    """Every usable tool from a tools.json, normalized once and ready to replay.
+
+    Only tools that `parse_json_schema` accepted at compile time are kept, so replaying
+    any subset into a fresh `TypeBuilder` cannot fail on bad schemas or missing `$ref`s.
+    `$ref`s are resolved at compile time in the sense that every one is checked and each
+    schema keeps only its transitive ref closure (see `index_tools`); they are not
+    inlined, since SchemaAdder turns each referenced definition into one named class and
+    looking it up on replay is a dict read.
+    """
+
+    def __init__(self, content_hash: str, tools: list[LazyTool]):
+        self.content_hash = content_hash
+        self.tools = tools
+        self.by_name = {tool.name: tool for tool in tools}
+        self.servers: dict[str, list[LazyTool]] = {}
+        for tool in tools:
+            self.servers.setdefault(tool.server, []).append(tool)
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+    def register(self, tb: TypeBuilder, names: Iterable[str]) -> list[FieldType]:
+        selected = materialize_tools(tb, (self.by_name[name] for name in names))
+        return [field_type for field_type, _ in selected.values()]
+
+
+def compile_tools(data: Dict[str, Any]) -> list[LazyTool]:
+    # Parse everything into one scratch TypeBuilder, like parse_tools, so tools whose
+    # schemas fail (unsupported types, dangling $refs, clashing class names) are dropped
+    tb = TypeBuilder()
+    compiled: list[LazyTool] = []
+    for tool in index_tools(data).values():
+        try:
+            tool.materialize(tb)
+        except Exception:
+            continue
+        tool.schema.pop("$schema", None)
+        compiled.append(tool)
+    return compiled
+
+
+def _read_cache(cache_path: Path) -> list[LazyTool] | None:
+    if not cache_path.exists():
+        return None
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # A truncated or incompatible cache file is just a cache miss
+        return None
+
+
+def _write_cache(cache_path: Path, tools: list[LazyTool]) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(tools, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+
+_loaded: dict[str, tuple[tuple[int, int], ToolCatalog]] = {}
+
+
+def load_catalog(tool_file_path: str, cache_dir: Path = CATALOG_DIR) -> ToolCatalog:
+    """Load the compiled catalog for `tool_file_path`, compiling it on first use.
+
+    Compiled catalogs are pickled under `cache_dir` keyed by the file's content hash, and
+    kept in memory until the file's mtime or size changes.
+    """
+    stat = os.stat(tool_file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(tool_file_path)
+    if (cached := _loaded.get(key)) is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(tool_file_path, "rb") as f:
+        raw = f.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    cache_path = cache_dir / f"{content_hash}.v{CATALOG_VERSION}.pickle"
+
+    tools = _read_cache(cache_path)
+    if tools is None:
+        tools = compile_tools(json.loads(raw))
+        _write_cache(cache_path, tools)
+
+    catalog = ToolCatalog(content_hash, tools)
+    _loaded[key] = (signature, catalog)
+    return catalog
@@ -0,0 +1,156 @@
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, Mapping, Sequence
+
+import numpy as np
+from parse_json_schema import LazyTool
+from similarity import SimilarityIndex, normalize, top_k_indices
+
+
+@dataclass
+class ToolShard:
+    server: str
+    # Row-aligned with `index`; only the tools that have been synced so far
+    tools: list[LazyTool]
+    names: list[str]
+    texts: list[str]
+    index: SimilarityIndex
+    # The catalog's tool list for this server when `retain` last checked the rows
+    source: Sequence[LazyTool] | None = None
+
+
+class ShardedToolIndex:
+    """Tool embeddings kept as one shard per MCP server.
+
+    Shards fill lazily: `sync` embeds only the tools it is given, so a turn pays for the
+    candidates it is about to search instead of every tool on their servers, and a tool
+    is re-embedded only when its text changes. Searches score each shard separately and
+    merge the per-shard top-k with a heap.
+    """
+
+    def __init__(self, embedding_text: Callable[[LazyTool], str]):
+        self.embedding_text = embedding_text
+        self.shards: dict[str, ToolShard] = {}
+        self._locations: dict[str, tuple[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    async def sync(
+        self,
+        servers: Mapping[str, Sequence[LazyTool]],
+        embed_many: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[str]:
+        """Embed the tools in `servers` that have no current vector; returns the servers that changed."""
+        pending: dict[str, dict[str, tuple[LazyTool, str]]] = {}
+        for server, tools in servers.items():
+            shard = self.shards.get(server)
+            for tool in tools:
+                location = self._locations.get(tool.name)
+                row = location[1] if location is not None and location[0] == server else None
+                # Catalogs are immutable and memoized, so the same object means the same text
+                if row is not None and shard.tools[row] is tool:
+                    continue
+                text = self.embedding_text(tool)
+                if row is not None and shard.texts[row] == text:
+                    shard.tools[row] = tool
+                    continue
+                pending.setdefault(server, {})[tool.name] = (tool, text)
+        if not pending:
+            return []
+
+        missing = list(dict.fromkeys(text for tools in pending.values() for _, text in tools.values()))
+        vectors = dict(zip(missing, await embed_many(missing)))
+        for server, tools in pending.items():
+            self._extend(server, [(tool, text, vectors[text]) for tool, text in tools.values()])
+        return list(pending)
+
+    def _extend(self, server: str, entries: list[tuple[LazyTool, str, list[float]]]) -> None:
+        """Add or replace rows of a shard, swapping in a new shard so searches never see half of it."""
+        shard = self.shards.get(server)
+        tools = list(shard.tools) if shard is not None else []
+        texts = list(shard.texts) if shard is not None else []
+        rows = list(shard.index.matrix) if shard is not None else []
+        for tool, text, vector in entries:
+            location = self._locations.get(tool.name)
+            if location is not None and location[0] == server:
+                row = location[1]
+                tools[row], texts[row], rows[row] = tool, text, vector
+            else:
+                tools.append(tool)
+                texts.append(text)
+                rows.append(vector)
+        source = shard.source if shard is not None else None
+        self._put(ToolShard(server, tools, [tool.name for tool in tools], texts, SimilarityIndex(rows), source))
+
+    def _put(self, shard: ToolShard) -> None:
+        self.remove(shard.server)
+        self.shards[shard.server] = shard
+        for row, name in enumerate(shard.names):
+            self._locations[name] = (shard.server, row)
+
+    def remove(self, server: str) -> None:
+        shard = self.shards.pop(server, None)
+        if shard is None:
+            return
+        for name in shard.names:
+            if self._locations.get(name, (None,))[0] == server:
+                del self._locations[name]
+
+    def retain(self, servers: Mapping[str, Sequence[LazyTool]]) -> None:
+        """Drop shards for servers no longer in the catalog, and rows for tools their server dropped."""
+        for server in [server for server in self.shards if server not in servers]:
+            self.remove(server)
+        for server, shard in list(self.shards.items()):
+            source = servers[server]
+            if shard.source is source:
+                continue
+            current = {tool.name for tool in source}
+            keep = [row for row, name in enumerate(shard.names) if name in current]
+            if len(keep) == len(shard.names):
+                shard.source = source
+            elif not keep:
+                self.remove(server)
+            else:
+                self._put(
+                    ToolShard(
+                        server,
+                        [shard.tools[row] for row in keep],
+                        [shard.names[row] for row in keep],
+                        [shard.texts[row] for row in keep],
+                        SimilarityIndex(shard.index.matrix[keep]),
+                        source,
+                    )
+                )
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int,
+        names: Iterable[str] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Top-k `(tool_name, cosine_similarity)` across shards, optionally only among `names`."""
+        query_vector = normalize(np.asarray(query, dtype=np.float32))
+
+        if names is None:
+            rows_by_server: dict[str, np.ndarray | None] = {server: None for server in self.shards}
+        else:
+            grouped: dict[str, list[int]] = {}
+            for name in names:
+                if (location := self._locations.get(name)) is not None:
+                    grouped.setdefault(location[0], []).append(location[1])
+            rows_by_server = {server: np.asarray(rows) for server, rows in grouped.items()}
+
+        per_shard: list[list[tuple[float, str]]] = []
+        for server, rows in rows_by_server.items():
+            shard = self.shards[server]
+            matrix = shard.index.matrix if rows is None else shard.index.matrix[rows]
+            scores = matrix @ query_vector
+            best = top_k_indices(scores, k)
+            shard_rows = best if rows is None else rows[best]
+            per_shard.append([(float(scores[i]), shard.names[row]) for i, row in zip(best, shard_rows)])
+
+        # Each shard's list is already sorted best first, so a k-way heap merge suffices
+        merged = heapq.merge(*per_shard, key=lambda hit: hit[0], reverse=True)
+        return [(name, score) for score, name in itertools.islice(merged, k)]
@@ -1,50 +1,77 @@
+import functools
+import itertools
 import json
-from typing import Any, Awaitable, Dict
+from typing import Any, Dict
 
 import openai
 from baml_client.type_builder import TypeBuilder
-from parse_json_schema import TOOL_NAME_KEY, parse_tools
+from parse_json_schema import TOOL_NAME_KEY, LazyTool
+from tool_catalog import ToolCatalog, load_catalog
+from lexical_index import BM25Index
+from tool_index import ShardedToolIndex
 from baml_client import b
 from baml_client.types import HumanMessage, Actions
-from baml_py.baml_py import FieldType
-import numpy as np
+from embedding_client import BatchingEmbeddingClient
 import asyncio
 
 
 async def load_tools(query: str, tool_file_path: str) -> TypeBuilder:
+    # Parsing tools.json happens once per file version, each turn only replays the
+    # handful of selected tools into a fresh TypeBuilder
+    catalog = load_catalog(tool_file_path)
+    candidates = narrow_tools(query, catalog)
+    selected = await _narrow_down_categories(query, catalog, candidates)
     tb = TypeBuilder()
-    tools = parse_tools(tool_file_path, tb)
-    tool_types = list(tools.values())[:100]
-    tool_options = tb.union(await _narrow_down_categories(query, tool_types))
+    tool_options = tb.union(catalog.register(tb, [tool.name for tool in selected]))
     tb.Actions.add_property("tools", tool_options)
     return tb
 
 client = openai.AsyncOpenAI()
+# Concurrent embed() calls are coalesced into a few batched requests instead of one per tool
+embedder = BatchingEmbeddingClient(client, model="text-embedding-3-small", max_in_flight=4)
 
 async def embed(text: str) -> list[float]:
-    response = await client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text,
-    )
-    return response.data[0].embedding
+    return await embedder.embed(text)
+
+def tool_embedding_text(tool: LazyTool) -> str:
+    return json.dumps(tool.tool)
+
+# One shard per MCP server, so a changed server only re-embeds its own tools
+tool_index = ShardedToolIndex(tool_embedding_text)
 
-async def _narrow_down_categories(text: str, tools: list[tuple[FieldType, Dict[str, Any]]]) -> list[FieldType]:
-    embeddings: list[tuple[FieldType, Awaitable[list[float]]]] = []
-    for category in tools:
-        embeddings.append((category[0], embed(json.dumps(category[1]))))
-    embedding_caught = await asyncio.gather(*[e[1] for e in embeddings])
+async def _narrow_down_categories(text: str, catalog: ToolCatalog, tools: list[LazyTool]) -> list[LazyTool]:
+    # Only the candidates get embedded; the rest of their servers' tools wait until they
+    # are candidates themselves
+    by_server: Dict[str, list[LazyTool]] = {}
+    for tool in tools:
+        by_server.setdefault(tool.server, []).append(tool)
+    tool_index.retain(catalog.servers)
+    _, text_embedding = await asyncio.gather(
+        tool_index.sync(by_server, embedder.embed_many),
+        embed(text),
+    )
 
-    text_embedding = await embed(text)
-    best_matches: list[tuple[FieldType, float]] = []
-    for category, embedding in zip(embeddings, embedding_caught):
-        cosine_similarity = np.dot(text_embedding, embedding) / (np.linalg.norm(text_embedding) * np.linalg.norm(embedding))
-        best_matches.append((category[0], cosine_similarity))
     max_matches = 10
-    matches = sorted(best_matches, key=lambda x: x[1], reverse=True)[:max_matches]
-    return [match[0] for match in matches]
+    hits = tool_index.search(text_embedding, max_matches, names=[tool.name for tool in tools])
+    return [catalog.by_name[name] for name, _ in hits]
+
+@functools.lru_cache(maxsize=4)
+def lexical_index(catalog: ToolCatalog) -> BM25Index:
+    return BM25Index([f"{tool.name} {tool.server} {tool.tool.get('description') or ''}" for tool in catalog.tools])
+
+def narrow_tools(query: str, catalog: ToolCatalog, max_candidates: int = 300) -> list[LazyTool]:
+    """Stage one of routing: BM25 over tool names, server names and descriptions.
 
-def narrow_tools(query: str, tools: list[FieldType]) -> list[FieldType]:
-    return tools[:50]
+    The vector rerank in `_narrow_down_categories` then only embeds these candidates. If
+    the query shares too few words with the catalog, the rest is padded in catalog order.
+    """
+    hits = lexical_index(catalog).search(query, max_candidates)
+    candidates = [catalog.tools[doc_id] for doc_id, _ in hits]
+    if len(candidates) < max_candidates:
+        seen = {tool.name for tool in candidates}
+        padding = (tool for tool in catalog.tools if tool.name not in seen)
+        candidates.extend(itertools.islice(padding, max_candidates - len(candidates)))
+    return candidates
 
 def sort_actions(actions: list[Actions | HumanMessage]) -> list[Actions | HumanMessage]:
     return sorted(actions, key=lambda x: isinstance(x, HumanMessage))
@@ -16,7 +16,9 @@ class LumaClient:
         self.base_url = "https://public-api.lu.ma/public/v1"
         self.headers = {"accept": "application/json", "x-luma-api-key": self.api_key}
 
-    def get_event_for_zoom_meeting(self, zoom_meeting_id: str) -> Optional[LumaEvent]:
+    async def get_event_for_zoom_meeting(
+        self, zoom_meeting_id: str
+    ) -> Optional[LumaEvent]:
         """
         Get the Luma event for a specific Zoom meeting by:
         1. Getting Zoom recording details to find the date
@@ -34,36 +36,22 @@ class LumaClient:
             )
 
             # First, get the Zoom recording details to find the date
-            from zoom_client import zoom_client
-
-            recordings = zoom_client.get_recordings()
-            zoom_recording = None
-
-            logger.info(f"Found {len(recordings)} total Zoom recordings")
-
-            for rec in recordings:
-                # Log the comparison for debugging
-                rec_meeting_id = rec["meeting_id"]
-                logger.debug(
-                    f"Comparing {rec_meeting_id} (type: {type(rec_meeting_id)}) with {zoom_meeting_id}"
-                )
-
-                if str(rec_meeting_id) == str(zoom_meeting_id):
-                    zoom_recording = rec
-                    logger.info(
-                        f"Found matching Zoom recording: {rec.get('meeting_title')}"
-                    )
-                    break
+            from recordings_catalog import recordings_catalog
 
-            if not zoom_recording:
+            recordings = await recordings_catalog.get_meeting_recordings(
+                zoom_meeting_id
+            )
+            if not recordings:
                 logger.warning(
                     f"No Zoom recording found for meeting ID: {zoom_meeting_id}"
                 )
-                logger.warning(
-                    f"Available meeting IDs: {[rec['meeting_id'] for rec in recordings[:5]]}..."
-                )  # Show first 5
                 return None
 
+            zoom_recording = recordings[0]
+            logger.info(
+                f"Found matching Zoom recording: {zoom_recording.get('meeting_title')}"
+            )
+
             # Parse recording date
             recording_start = zoom_recording.get("recording_start")
             if not recording_start:
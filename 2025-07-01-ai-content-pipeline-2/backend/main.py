@@ -8,6 +8,7 @@ import logging
 import asyncio
 import json
 from pathlib import Path
+from contextlib import asynccontextmanager
 
 from models import (
     VideoImportRequest,
@@ -33,6 +34,7 @@ from models import (
 )
 from database import db
 from zoom_client import zoom_client
+from recordings_catalog import recordings_catalog
 from video_processor import video_processor
 from luma_client import luma_client
 from baml_client import types
@@ -49,7 +51,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Content Pipeline API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the Zoom recordings catalog warm so lookups rarely wait on Zoom
+    recordings_catalog.start_background_refresh()
+    yield
+    await recordings_catalog.stop()
+    # Close the pooled Zoom API connections
+    await zoom_client.aclose()
+
+
+app = FastAPI(title="AI Content Pipeline API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -232,7 +245,7 @@ async def get_luma_match_for_zoom_recording(meeting_id: str):
             }
 
         # Use the simplified Luma client method
-        luma_event = luma_client.get_event_for_zoom_meeting(meeting_id)
+        luma_event = await luma_client.get_event_for_zoom_meeting(meeting_id)
 
         if luma_event:
             return {"matched": True, "event": luma_event}
@@ -1030,7 +1043,7 @@ async def test_zoom():
 
     try:
         # Test the Zoom client
-        recordings = zoom_client.get_recordings()
+        recordings = await zoom_client.get_recordings()
         return {
             "status": "configured",
             "message": "Zoom OAuth credentials valid",
@@ -1049,7 +1062,7 @@ async def get_zoom_recordings(
 ):
     """Fetch existing Zoom recordings, grouped by meeting"""
     try:
-        recordings_data = zoom_client.get_recordings(
+        recordings_data = await recordings_catalog.list_recordings(
             user_id=user_id, from_date=from_date, to_date=to_date
         )
         # Group by meeting_id
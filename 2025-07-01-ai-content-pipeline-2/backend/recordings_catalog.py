@@ -0,0 +1,213 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from zoom_client import ZoomClient, zoom_client
+
+Recording = Dict[str, Any]
+
+
+class RecordingsCatalog:
+    """In-memory index of the account's recent Zoom recordings.
+
+    Holds the rows `ZoomClient.get_recordings` returns for the last `window_days`,
+    indexed by meeting_id and (meeting_id, recording_type), so per-meeting lookups are
+    dict reads instead of paginated Zoom calls. Once `ttl_seconds` old the catalog is
+    still served while a background refresh runs; refreshes only re-fetch the days
+    since the last one (plus `overlap_days`, for recordings that finished processing
+    late) and merge them in.
+    """
+
+    def __init__(
+        self,
+        client: ZoomClient,
+        ttl_seconds: float = 300,
+        window_days: int = 30,
+        overlap_days: int = 2,
+        miss_refresh_seconds: float = 30,
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.window_days = window_days
+        self.overlap_days = overlap_days
+        # A lookup miss refreshes at most this often, e.g. for a meeting that just ended
+        self.miss_refresh_seconds = miss_refresh_seconds
+
+        self._by_meeting: Dict[str, List[Recording]] = {}
+        self._by_meeting_type: Dict[Tuple[str, str], Recording] = {}
+        self._by_type: Dict[str, List[Recording]] = defaultdict(list)
+        self._covered_from: Optional[date] = None
+        self._covered_to: Optional[date] = None
+        self._refreshed_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._background_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._covered_to is not None
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._refreshed_at > self.ttl_seconds
+
+    async def refresh(self, full: bool = False) -> None:
+        """Fetch new recordings; concurrent callers share one in-flight refresh"""
+        task = self._start_refresh(full)
+        # Shielded so a cancelled caller does not cancel the refresh others wait on
+        await asyncio.shield(task)
+
+    def _start_refresh(self, full: bool) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(full))
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        return self._refresh_task
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Recordings catalog refresh failed: {task.exception()}")
+
+    async def _refresh(self, full: bool) -> None:
+        today = datetime.now().date()
+        window_start = today - timedelta(days=self.window_days)
+        if full or self._covered_to is None:
+            from_date = window_start
+        else:
+            overlap_start = self._covered_to - timedelta(days=self.overlap_days)
+            from_date = max(window_start, overlap_start)
+
+        print(f"Refreshing Zoom recordings catalog from {from_date} to {today}...")
+        recordings = await self.client.get_recordings(
+            from_date=from_date.isoformat(), to_date=today.isoformat()
+        )
+
+        by_meeting = {} if full else dict(self._by_meeting)
+        fetched: Dict[str, List[Recording]] = defaultdict(list)
+        for rec in recordings:
+            fetched[rec["meeting_id"]].append(rec)
+        # A re-fetched meeting replaces its old rows, so deleted files disappear too
+        by_meeting.update(fetched)
+        # Drop meetings that have aged out of the window
+        cutoff = window_start.isoformat()
+        by_meeting = {
+            meeting_id: recs
+            for meeting_id, recs in by_meeting.items()
+            if (self._start_date(recs) or cutoff) >= cutoff
+        }
+
+        self._rebuild_indexes(by_meeting)
+        self._covered_from = window_start
+        self._covered_to = today
+        self._refreshed_at = time.monotonic()
+        print(
+            f"Recordings catalog has {len(by_meeting)} meetings "
+            f"({len(fetched)} fetched from {from_date})"
+        )
+
+    def _rebuild_indexes(self, by_meeting: Dict[str, List[Recording]]) -> None:
+        by_meeting_type: Dict[Tuple[str, str], Recording] = {}
+        by_type: Dict[str, List[Recording]] = defaultdict(list)
+        for meeting_id, recs in by_meeting.items():
+            for rec in recs:
+                by_meeting_type.setdefault((meeting_id, rec["recording_type"]), rec)
+                by_type[rec["recording_type"]].append(rec)
+        # Swap whole dicts so readers never see a half-built index
+        self._by_meeting = by_meeting
+        self._by_meeting_type = by_meeting_type
+        self._by_type = by_type
+
+    @staticmethod
+    def _start_date(recs: List[Recording]) -> Optional[str]:
+        starts = [rec["recording_start"] for rec in recs if rec.get("recording_start")]
+        return min(starts)[:10] if starts else None
+
+    async def _ensure_fresh(self) -> None:
+        if not self.is_loaded:
+            await self.refresh()
+        elif self.is_stale:
+            # Serve the current catalog and refresh behind it
+            self._start_refresh(False)
+
+    async def get_meeting_recordings(self, meeting_id: str) -> List[Recording]:
+        """All recording files of a meeting, or [] if it is not in the window"""
+        meeting_id = str(meeting_id)
+        await self._ensure_fresh()
+        recs = self._by_meeting.get(meeting_id)
+        since_refresh = time.monotonic() - self._refreshed_at
+        if recs is None and since_refresh > self.miss_refresh_seconds:
+            await self.refresh()
+            recs = self._by_meeting.get(meeting_id)
+        return list(recs or [])
+
+    async def get_recording(
+        self, meeting_id: str, recording_type: str
+    ) -> Optional[Recording]:
+        """The meeting's file of `recording_type`, e.g. "shared_screen" """
+        if not await self.get_meeting_recordings(meeting_id):
+            return None
+        return self._by_meeting_type.get((str(meeting_id), recording_type))
+
+    async def get_recordings_by_type(self, recording_type: str) -> List[Recording]:
+        await self._ensure_fresh()
+        return list(self._by_type.get(recording_type, []))
+
+    async def list_recordings(
+        self,
+        user_id: str = "me",
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+    ) -> List[Recording]:
+        """Rows like `ZoomClient.get_recordings`, served from the catalog if it can"""
+        if user_id != "me":
+            return await self.client.get_recordings(user_id, from_date, to_date)
+        await self._ensure_fresh()
+        if from_date and from_date < self._covered_from.isoformat():
+            return await self.client.get_recordings(user_id, from_date, to_date)
+        recordings = [
+            rec
+            for recs in self._by_meeting.values()
+            for rec in recs
+            if self._in_range(rec, from_date, to_date)
+        ]
+        # Newest first, like the Zoom API
+        recordings.sort(key=lambda rec: rec.get("recording_start") or "", reverse=True)
+        return recordings
+
+    @staticmethod
+    def _in_range(
+        rec: Recording, from_date: Optional[str], to_date: Optional[str]
+    ) -> bool:
+        day = (rec.get("recording_start") or "")[:10]
+        if not day:
+            return True
+        return (not from_date or day >= from_date) and (not to_date or day <= to_date)
+
+    def start_background_refresh(self) -> None:
+        """Refresh every `ttl_seconds` so lookups rarely wait on Zoom"""
+        if self._background_task is None or self._background_task.done():
+            self._background_task = asyncio.create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Recordings catalog refresh failed: {e}")
+            await asyncio.sleep(self.ttl_seconds)
+
+    async def stop(self) -> None:
+        for task in (self._background_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._background_task = None
+        self._refresh_task = None
+
+
+# Global catalog instance
+recordings_catalog = RecordingsCatalog(zoom_client)
@@ -1,5 +1,4 @@
 import os
-import requests
 import hashlib
 from typing import Optional
 from googleapiclient.discovery import build
@@ -10,6 +9,7 @@ from google.auth.transport.requests import Request
 
 from database import db
 from zoom_client import zoom_client
+from recordings_catalog import recordings_catalog
 
 
 class VideoProcessor:
@@ -128,16 +128,12 @@ class VideoProcessor:
         try:
             print(f"Looking for recordings for meeting {zoom_meeting_id}...")
 
-            # Get recording details from Zoom API
-            recordings = zoom_client.get_recordings()
+            # Get the meeting's recordings from the cached catalog
+            meeting_recordings = await recordings_catalog.get_meeting_recordings(
+                zoom_meeting_id
+            )
             recording = None
 
-            # Find the meeting and get all its recordings
-            meeting_recordings = []
-            for rec in recordings:
-                if rec["meeting_id"] == zoom_meeting_id:
-                    meeting_recordings.append(rec)
-
             if not meeting_recordings:
                 raise Exception(f"No recordings found for meeting {zoom_meeting_id}")
 
@@ -158,12 +154,11 @@ class VideoProcessor:
             ]
 
             for video_type in video_types:
-                for rec in meeting_recordings:
-                    if rec.get("recording_type") == video_type:
-                        recording = rec
-                        print(f"Selected recording type: {video_type}")
-                        break
+                recording = await recordings_catalog.get_recording(
+                    zoom_meeting_id, video_type
+                )
                 if recording:
+                    print(f"Selected recording type: {video_type}")
                     break
 
             if not recording:
@@ -200,37 +195,15 @@ class VideoProcessor:
                 f"Downloading {recording.get('recording_type')} from: {download_url[:100]}..."
             )
 
-            # Download the file with proper authentication
-            headers = {
-                "Authorization": f"Bearer {zoom_client.access_token}",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            }
-
-            # First try with authentication
-            response = requests.get(download_url, headers=headers, stream=True)
-
-            if response.status_code != 200:
-                print(
-                    f"Download with auth failed ({response.status_code}), trying without auth..."
-                )
-                # Try without authentication as fallback
-                response = requests.get(download_url, stream=True)
-
-            if response.status_code != 200:
-                raise Exception(
-                    f"Failed to download video: HTTP {response.status_code}"
-                )
-
-            # Download to cache file
+            # Stream to the cache file on the Zoom client's pooled connections
             print(f"Downloading to cache file: {cache_filename}")
-            with open(cache_filename, "wb") as f:
-                total_size = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        total_size += len(chunk)
-                        if total_size % (1024 * 1024) == 0:  # Print progress every MB
-                            print(f"Downloaded {total_size // (1024 * 1024)} MB")
+            total_size = await zoom_client.download_to_file(
+                download_url,
+                cache_filename,
+                headers={
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                },
+            )
 
             print(
                 f"Successfully downloaded video file: {cache_filename} ({total_size} bytes)"
@@ -244,7 +217,7 @@ class VideoProcessor:
     async def _get_transcript(self, zoom_meeting_id: str) -> Optional[str]:
         """Get transcript from Zoom recording"""
         try:
-            transcript = zoom_client.get_transcript(zoom_meeting_id)
+            transcript = await zoom_client.get_transcript(zoom_meeting_id)
             if transcript:
                 print(
                     f"Successfully retrieved transcript for meeting {zoom_meeting_id}"
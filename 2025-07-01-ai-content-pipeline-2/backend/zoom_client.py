@@ -1,7 +1,9 @@
 import os
 import json
-import requests
 import base64
+import random
+import asyncio
+import httpx
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -9,28 +11,56 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Retry 429s, server errors and dropped connections with jittered exponential backoff
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10.0
+
 
 class ZoomClient:
-    def __init__(self):
+    def __init__(
+        self,
+        timeout: Optional[httpx.Timeout] = None,
+        limits: Optional[httpx.Limits] = None,
+    ):
         self.base_url = "https://api.zoom.us/v2"
-        self.access_token = self._get_access_token()
-
-    def _get_access_token(self) -> str:
+        self.access_token = self._load_access_token()
+        self.timeout = timeout or httpx.Timeout(30.0, connect=10.0)
+        self.limits = limits or httpx.Limits(
+            max_connections=20, max_keepalive_connections=10
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive connection pool, created on first use in the event loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, follow_redirects=True
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled connections, e.g. on application shutdown"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _load_access_token(self) -> Optional[str]:
         """Get Zoom access token from stored credentials"""
         try:
-            # First try to load from zoom_token.json
             if os.path.exists("zoom_token.json"):
                 with open("zoom_token.json", "r") as f:
                     token_data = json.load(f)
                 return token_data["access_token"]
-            else:
-                # Fallback to getting a new token
-                return self._get_new_token()
         except Exception as e:
-            print(f"Failed to get Zoom access token: {e}")
-            return self._get_new_token()
+            print(f"Failed to load Zoom access token: {e}")
+        # A new token is fetched on the first request
+        return None
 
-    def _get_new_token(self) -> str:
+    async def _get_new_token(self) -> str:
         """Get new access token using server-to-server OAuth"""
         account_id = os.getenv("ZOOM_ACCOUNT_ID")
         client_id = os.getenv("ZOOM_CLIENT_ID")
@@ -41,8 +71,10 @@ class ZoomClient:
 
         auth_header = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
 
-        response = requests.post(
-            f"https://zoom.us/oauth/token?grant_type=account_credentials&account_id={account_id}",
+        response = await self._send(
+            "POST",
+            "https://zoom.us/oauth/token",
+            params={"grant_type": "account_credentials", "account_id": account_id},
             headers={"Authorization": f"Basic {auth_header}"},
         )
 
@@ -57,20 +89,76 @@ class ZoomClient:
         else:
             raise Exception(f"Failed to get server token: {response.text}")
 
-    def _make_request(
+    async def _refresh_token(self, stale_token: Optional[str]) -> str:
+        """Replace `stale_token`; concurrent callers share a single refresh"""
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            # Another request already refreshed while we waited for the lock
+            if self.access_token and self.access_token != stale_token:
+                return self.access_token
+            self.access_token = await self._get_new_token()
+            return self.access_token
+
+    async def _get_token(self) -> str:
+        if self.access_token:
+            return self.access_token
+        return await self._refresh_token(None)
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After on 429s"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        return random.uniform(
+            0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+        )
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request on the shared pool, retrying transient failures"""
+        for attempt in range(MAX_RETRIES + 1):
+            response = None
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                reason = f"{type(e).__name__}: {e}"
+            delay = self._retry_delay(attempt, response)
+            print(f"Zoom request failed ({reason}), retrying in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _authorized_get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET with the bearer token, refreshing it once on 401"""
+        token = await self._get_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await self._send("GET", url, headers=headers, **kwargs)
+        if response.status_code == 401:
+            print("Token expired, trying to refresh...")
+            token = await self._refresh_token(token)
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await self._send("GET", url, headers=headers, **kwargs)
+        return response
+
+    async def _make_request(
         self, method: str, endpoint: str, params: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """Make authenticated request to Zoom API"""
         url = f"{self.base_url}{endpoint}"
+        token = await self._get_token()
         headers = {
-            "Authorization": f"Bearer {self.access_token}",
+            "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
 
         print(f"Making {method} request to: {url}")
-        print(f"Using access token: {self.access_token[:20]}...")
 
-        response = requests.request(method, url, headers=headers, params=params)
+        response = await self._send(method, url, headers=headers, params=params)
 
         print(f"Response status: {response.status_code}")
         if response.status_code >= 400:
@@ -78,10 +166,10 @@ class ZoomClient:
 
         if response.status_code == 401:
             print("Token expired, trying to refresh...")
-            # Token expired, try to get a new token
-            self.access_token = self._get_new_token()
-            headers["Authorization"] = f"Bearer {self.access_token}"
-            response = requests.request(method, url, headers=headers, params=params)
+            # Token expired; concurrent 401s wait for one shared refresh
+            token = await self._refresh_token(token)
+            headers["Authorization"] = f"Bearer {token}"
+            response = await self._send(method, url, headers=headers, params=params)
 
             print(f"After refresh - Response status: {response.status_code}")
             if response.status_code >= 400:
@@ -92,7 +180,7 @@ class ZoomClient:
 
         return response.json()
 
-    def get_recordings(
+    async def get_recordings(
         self,
         user_id: str = "me",
         from_date: Optional[str] = None,
@@ -113,7 +201,9 @@ class ZoomClient:
             if page_token:
                 params["next_page_token"] = page_token
 
-            response = self._make_request("GET", f"/users/{user_id}/recordings", params)
+            response = await self._make_request(
+                "GET", f"/users/{user_id}/recordings", params
+            )
 
             if "meetings" in response:
                 for meeting in response["meetings"]:
@@ -146,11 +236,13 @@ class ZoomClient:
 
         return recordings
 
-    def get_recording_details(
+    async def get_recording_details(
         self, meeting_id: str, recording_id: str
     ) -> Dict[str, Any]:
         """Get detailed information about a specific recording"""
-        response = self._make_request("GET", f"/meetings/{meeting_id}/recordings")
+        response = await self._make_request(
+            "GET", f"/meetings/{meeting_id}/recordings"
+        )
 
         for recording in response.get("recording_files", []):
             if recording["id"] == recording_id:
@@ -170,11 +262,13 @@ class ZoomClient:
 
         raise Exception(f"Recording {recording_id} not found in meeting {meeting_id}")
 
-    def get_transcript(self, meeting_id: str) -> Optional[str]:
+    async def get_transcript(self, meeting_id: str) -> Optional[str]:
         """Get audio transcript for a specific meeting"""
         try:
             print(f"Getting recordings for meeting {meeting_id}...")
-            response = self._make_request("GET", f"/meetings/{meeting_id}/recordings")
+            response = await self._make_request(
+                "GET", f"/meetings/{meeting_id}/recordings"
+            )
 
             print(f"Found {len(response.get('recording_files', []))} recording files")
             for i, recording in enumerate(response.get("recording_files", [])):
@@ -188,12 +282,8 @@ class ZoomClient:
                     if transcript_url:
                         print(f"Found transcript URL: {transcript_url}")
                         # Include authorization headers for the download
-                        headers = {
-                            "Authorization": f"Bearer {self.access_token}",
-                            "Content-Type": "application/json",
-                        }
-                        transcript_response = requests.get(
-                            transcript_url, headers=headers
+                        transcript_response = await self._authorized_get(
+                            transcript_url
                         )
                         if transcript_response.status_code == 200:
                             transcript_text = transcript_response.text
@@ -206,7 +296,9 @@ class ZoomClient:
                                 f"Failed to download transcript: {transcript_response.status_code} - {transcript_response.text[:200]}"
                             )
                             # Try without headers as fallback
-                            transcript_response = requests.get(transcript_url)
+                            transcript_response = await self._send(
+                                "GET", transcript_url
+                            )
                             if transcript_response.status_code == 200:
                                 transcript_text = transcript_response.text
                                 print(
@@ -223,11 +315,15 @@ class ZoomClient:
             print(f"Error getting transcript for meeting {meeting_id}: {e}")
             return None
 
-    def _get_chat_transcript(self, meeting_id: str, recording_id: str) -> Optional[str]:
+    async def _get_chat_transcript(
+        self, meeting_id: str, recording_id: str
+    ) -> Optional[str]:
         """Get chat transcript as fallback"""
         try:
             # Try to get chat messages from the meeting
-            response = self._make_request("GET", f"/meetings/{meeting_id}/recordings")
+            response = await self._make_request(
+                "GET", f"/meetings/{meeting_id}/recordings"
+            )
 
             # Look for chat transcript in recording files
             for recording in response.get("recording_files", []):
@@ -236,7 +332,7 @@ class ZoomClient:
                         if file.get("recording_type") == "CHAT":
                             chat_url = file.get("download_url")
                             if chat_url:
-                                chat_response = requests.get(chat_url)
+                                chat_response = await self._send("GET", chat_url)
                                 if chat_response.status_code == 200:
                                     return chat_response.text
 
@@ -246,6 +342,36 @@ class ZoomClient:
             print(f"Error getting chat transcript: {e}")
             return None
 
+    async def download_to_file(
+        self, url: str, path: str, headers: Optional[Dict[str, str]] = None
+    ) -> int:
+        """Stream a recording file to `path`; returns the number of bytes written"""
+        token = await self._get_token()
+        # First try with authentication, then without as a fallback
+        for auth in ({"Authorization": f"Bearer {token}"}, {}):
+            request_headers = {**(headers or {}), **auth}
+            async with self.client.stream(
+                "GET", url, headers=request_headers
+            ) as response:
+                if response.status_code != 200:
+                    mode = "with" if auth else "without"
+                    print(f"Download {mode} auth failed ({response.status_code})")
+                    continue
+                # Write to a temp file so an interrupted download never looks cached
+                partial_path = f"{path}.part"
+                total_size = 0
+                next_report = 1024 * 1024
+                with open(partial_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(chunk_size=1024 * 1024):
+                        f.write(chunk)
+                        total_size += len(chunk)
+                        if total_size >= next_report:  # Print progress every MB
+                            print(f"Downloaded {total_size // (1024 * 1024)} MB")
+                            next_report += 1024 * 1024
+                os.replace(partial_path, path)
+                return total_size
+        raise Exception(f"Failed to download file: HTTP {response.status_code}")
+
 
 # Global client instance
 zoom_client = ZoomClient()
@@ -10,7 +10,26 @@ async def write_research_report(query: str, summaries: list[str]) -> ReportData:
     return await b.WriteResearchReport(query=query, summaries=summaries)
 
 
+async def refine_research_report(query: str, report: ReportData, summaries: list[str]) -> ReportData:
+    """Revise a research report with search summaries that arrived after it was written.
+
+    This calls the BAML function `RefineResearchReport` defined in `baml_src/research.baml`.
+    """
+    return await b.RefineResearchReport(query=query, report=report, summaries=summaries)
+
+
+def stream_research_report(query: str, summaries: list[str]):
+    """Stream a research report using BAML.
+
+    This calls `WriteResearchReport` through `b.stream`. Iterate the returned stream for
+    partial `ReportData` as it is generated, then await `get_final_response()`.
+    """
+    return b.stream.WriteResearchReport(query=query, summaries=summaries)
+
+
 __all__ = [
     "ReportData",
+    "refine_research_report",
+    "stream_research_report",
     "write_research_report",
 ]
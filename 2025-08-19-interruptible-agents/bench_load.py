@@ -0,0 +1,299 @@
+"""Offline load benchmark for the conversation runtime.
+
+Swaps the BAML calls (PlanWebSearches, SummarizeSearchTerm, WriteResearchReport) for
+fakes with injected latency, runs N conversations at once and sends scripted info /
+replan / cancel messages to a share of them. Reports throughput, cancel-to-stop latency,
+event delivery lag (emit to subscriber wakeup), garbage collector pauses and memory per
+conversation. Collector pauses stall every event loop at once, so they tend to set the
+tail of the cancel latency when thousands of conversations are live.
+
+    uv run bench_load.py --conversations 1000 --scheduler loop --loops 2
+    uv run bench_load.py --conversations 200 --scheduler thread
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import gc
+import json
+import os
+import random
+import resource
+import threading
+import time
+from typing import Any, Dict
+
+os.environ.setdefault("BAML_LOG", "error")
+
+
+class FakeReportStream:
+    def __init__(self, report: Any, chunks: int, latency: float) -> None:
+        self.report = report
+        self.chunks = chunks
+        self.latency = latency
+
+    async def _partials(self):
+        markdown = self.report.markdown_report
+        step = max(1, len(markdown) // self.chunks)
+        for end in range(step, len(markdown) + step, step):
+            await asyncio.sleep(self.latency / self.chunks)
+            yield self.report.model_copy(update={"markdown_report": markdown[:end]})
+
+    def __aiter__(self):
+        return self._partials()
+
+    async def get_final_response(self) -> Any:
+        return self.report
+
+
+class _FakeStreamClient:
+    """Stands in for `b.stream`."""
+
+    def __init__(self, fake: "FakeB") -> None:
+        self.fake = fake
+
+    def WriteResearchReport(self, query: str, summaries: list[str]) -> FakeReportStream:
+        report = self.fake._make_report(query, summaries)
+        return FakeReportStream(report, chunks=20, latency=self.fake._latency("write"))
+
+
+class FakeB:
+    """Stands in for `baml_client.b`, sleeping a randomized latency per call."""
+
+    def __init__(self, latency_ms: Dict[str, float], searches: int, seed: int) -> None:
+        from agents.planner_agent import WebSearchItem, WebSearchPlan
+        from agents.writer_agent import ReportData
+
+        self._item, self._plan, self._report = WebSearchItem, WebSearchPlan, ReportData
+        self.latency_ms = latency_ms
+        self.searches = searches
+        self.rng = random.Random(seed)
+        self.stream = _FakeStreamClient(self)
+
+    def _latency(self, name: str) -> float:
+        # Long-tailed, like real LLM calls
+        return self.rng.lognormvariate(0, 0.5) * self.latency_ms[name] / 1000
+
+    async def PlanWebSearches(self, query: str) -> Any:
+        await asyncio.sleep(self._latency("plan"))
+        # Unique terms per query, so the summary cache does not hide the search load
+        return self._plan(searches=[
+            self._item(reason=f"aspect {i}", query=f"{query} #{i}") for i in range(self.searches)
+        ])
+
+    async def SummarizeSearchTerm(self, term: str, reason: str) -> str:
+        await asyncio.sleep(self._latency("search"))
+        return f"Findings for {term}: " + "lorem ipsum " * 40
+
+    def _make_report(self, query: str, summaries: list[str]) -> Any:
+        return self._report(
+            short_summary=f"Summary of {query}",
+            markdown_report=f"# {query}\n\n" + "\n\n".join(summaries),
+            follow_up_questions=["What next?", "What else?"],
+        )
+
+    async def WriteResearchReport(self, query: str, summaries: list[str]) -> Any:
+        await asyncio.sleep(self._latency("write"))
+        return self._make_report(query, summaries)
+
+    async def RefineResearchReport(self, query: str, report: Any, summaries: list[str]) -> Any:
+        await asyncio.sleep(self._latency("write"))
+        return report
+
+
+def install_fakes(fake: FakeB, max_search_concurrency: int) -> None:
+    import agents.planner_agent
+    import agents.search_agent
+    import agents.writer_agent
+    import manager
+    from search_cache import SearchSummaryCache
+    from search_executor import SearchExecutor
+
+    for module in (agents.planner_agent, agents.search_agent, agents.writer_agent):
+        module.b = fake  # type: ignore[attr-defined]
+    # Fresh shared state without provider rate limits: the fakes are the only backend
+    manager.default_executor = SearchExecutor(max_concurrency=max_search_concurrency)
+    manager.search_cache = SearchSummaryCache()
+
+
+def rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class GCPauses:
+    """Times each collector pass; full collections stall every loop in the process."""
+
+    def __init__(self) -> None:
+        self.pauses: list[float] = []
+        self._started = 0.0
+
+    def __call__(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+        else:
+            self.pauses.append(time.perf_counter() - self._started)
+
+    def start(self) -> None:
+        gc.callbacks.append(self)
+
+    def stop(self) -> None:
+        gc.callbacks.remove(self)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from runtime import EventLoopPool, InMemoryAgentSystem, Message, Pipeline
+
+    install_fakes(
+        FakeB({"plan": args.plan_ms, "search": args.search_ms, "write": args.write_ms}, args.searches, args.seed),
+        args.max_search_concurrency,
+    )
+    pool = EventLoopPool(args.loops) if args.scheduler == "loop" else None
+    system = InMemoryAgentSystem(
+        loop_pool=pool,
+        stream_report=args.stream,
+        pipeline=Pipeline(quorum=args.quorum) if args.quorum else None,
+    )
+
+    # Subscribers on their own loop measure emit-to-wakeup lag for every conversation
+    lags: list[float] = []
+    consumer_loop = asyncio.new_event_loop()
+    threading.Thread(target=consumer_loop.run_forever, daemon=True).start()
+
+    async def consume(runtime: Any) -> None:
+        subscription = runtime.subscribe(max_pending=10_000)
+        try:
+            while True:
+                events = await subscription.get()
+                now = time.monotonic()
+                lags.extend(now - evt.timestamp for evt in events)
+                if not events or any(evt.event_type == "done" for evt in events):
+                    return
+        finally:
+            runtime.unsubscribe(subscription)
+
+    rng = random.Random(args.seed)
+    convo_ids = [f"convo-{i}" for i in range(args.conversations)]
+    # Scripted interruptions: (delay after start, convo_id, message)
+    script: list[tuple[float, str, Message]] = []
+    for convo_id in convo_ids:
+        roll = rng.random()
+        delay = rng.uniform(0, (args.plan_ms + args.search_ms + args.write_ms) / 1000)
+        if roll < args.cancel_rate:
+            script.append((delay, convo_id, Message(kind="cancel")))
+        elif roll < args.cancel_rate + args.replan_rate:
+            script.append((delay, convo_id, Message(kind="replan", text=f"{convo_id} refocused")))
+        elif roll < args.cancel_rate + args.replan_rate + args.info_rate:
+            script.append((delay, convo_id, Message(kind="info", text="Prefer recent sources")))
+    script.sort(key=lambda entry: entry[0])
+
+    gc.collect()
+    rss_before = rss_mb()
+    gc_pauses = GCPauses()
+    gc_pauses.start()
+    started = time.monotonic()
+    consumers = []
+    for convo_id in convo_ids:
+        runtime = system.start(convo_id, f"Research topic {convo_id}")
+        consumers.append(asyncio.run_coroutine_threadsafe(consume(runtime), consumer_loop))
+    start_s = time.monotonic() - started
+
+    cancel_sent: dict[str, float] = {}
+    for delay, convo_id, msg in script:
+        wait = started + delay - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        if msg.kind == "cancel":
+            cancel_sent[convo_id] = time.monotonic()
+            system.cancel(convo_id)
+        else:
+            system.queue(convo_id, msg)
+
+    rss_peak = rss_mb()
+    threads_peak = threading.active_count()
+    while not all(system.is_done(convo_id) for convo_id in convo_ids):
+        time.sleep(0.01)
+        rss_peak = max(rss_peak, rss_mb())
+        threads_peak = max(threads_peak, threading.active_count())
+    elapsed = time.monotonic() - started
+    gc_pauses.stop()
+
+    cancel_latencies: list[float] = []
+    statuses = {"done": 0, "cancelled": 0, "error": 0}
+    for convo_id in convo_ids:
+        runtime = system.get_runtime(convo_id)
+        statuses[runtime.status] = statuses.get(runtime.status, 0) + 1
+        if convo_id in cancel_sent and runtime.status == "cancelled":
+            done_at = next(evt.timestamp for evt in reversed(runtime.events) if evt.event_type == "done")
+            cancel_latencies.append(max(0.0, done_at - cancel_sent[convo_id]))
+
+    # The status turns terminal just before "done" is emitted, so let consumers see it
+    _, unfinished = concurrent.futures.wait(consumers, timeout=10)
+    for future in unfinished:
+        future.cancel()
+    concurrent.futures.wait(unfinished, timeout=1)
+    consumer_loop.call_soon_threadsafe(consumer_loop.stop)
+    if pool is not None:
+        pool.shutdown()
+
+    return {
+        "conversations": args.conversations,
+        "scheduler": args.scheduler,
+        "completed": statuses["done"],
+        "cancelled": statuses["cancelled"],
+        "errors": statuses["error"],
+        "consumers_cut_off": len(unfinished),
+        "start_s": start_s,
+        "elapsed_s": elapsed,
+        "throughput_per_s": statuses["done"] / elapsed,
+        "cancel_p50_ms": percentile(cancel_latencies, 50) * 1000,
+        "cancel_p99_ms": percentile(cancel_latencies, 99) * 1000,
+        "event_lag_p50_ms": percentile(lags, 50) * 1000,
+        "event_lag_p99_ms": percentile(lags, 99) * 1000,
+        "events": len(lags),
+        "gc_pause_max_ms": max(gc_pauses.pauses, default=0.0) * 1000,
+        "gc_pause_total_ms": sum(gc_pauses.pauses) * 1000,
+        "threads_peak": threads_peak,
+        "rss_per_convo_kb": max(0.0, rss_peak - rss_before) * 1024 / args.conversations,
+        "peak_rss_mb": rss_peak,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--scheduler", choices=["loop", "thread"], default="loop")
+    parser.add_argument("--loops", type=int, default=2, help="event loops for --scheduler loop")
+    parser.add_argument("--searches", type=int, default=8, help="planned searches per conversation")
+    parser.add_argument("--plan-ms", type=float, default=300)
+    parser.add_argument("--search-ms", type=float, default=800)
+    parser.add_argument("--write-ms", type=float, default=600)
+    parser.add_argument("--max-search-concurrency", type=int, default=512)
+    parser.add_argument("--info-rate", type=float, default=0.2, help="share of conversations sent an info message")
+    parser.add_argument("--replan-rate", type=float, default=0.1)
+    parser.add_argument("--cancel-rate", type=float, default=0.1)
+    parser.add_argument("--stream", action="store_true", help="stream the report as report_partial deltas")
+    parser.add_argument("--quorum", type=float, default=None, help="pipelined mode: write once this share is back")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the result as one JSON object")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        width = max(len(key) for key in result)
+        for key, value in result.items():
+            print(f"{key:>{width}}  {value:.4f}" if isinstance(value, float) else f"{key:>{width}}  {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""Multi-process backend: conversations spread across worker processes via a SQLite broker.
+
+The front end (`MultiProcessAgentSystem`) and every worker open the same SQLite file.
+Starting a conversation assigns it to the least loaded live worker; `queue` and `cancel`
+become commands addressed to that worker, and the worker writes the conversation's
+events back so any process can stream them. With a checkpoint file, a worker that dies
+is restarted by `supervise` and resumes the conversations it owned. `supervise` also
+forgets finished conversations, events and all, once `retention` seconds have passed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Optional
+
+from checkpoint import CheckpointStore
+from runtime import FINISHED, EventLoopPool, InMemoryAgentSystem, Message, ProgressEvent
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS routes (
+    convo_id TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    phase_index INTEGER NOT NULL DEFAULT 0,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS routes_by_worker ON routes (worker_id, status);
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    worker_id TEXT NOT NULL,
+    convo_id TEXT,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS commands_by_worker ON commands (worker_id, id);
+CREATE TABLE IF NOT EXISTS events (
+    convo_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    event_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (convo_id, seq)
+);
+"""
+
+# A worker that has not checked in for this long is treated as gone
+HEARTBEAT_TIMEOUT = 5.0
+# SQL placeholders for the statuses in FINISHED
+FINISHED_PARAMS = ", ".join("?" for _ in FINISHED)
+
+
+class Broker:
+    """The SQLite file shared by the front end and the workers."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    # ---------- Front end ----------
+    def assign(self, convo_id: str, query: str) -> str:
+        """Route a new conversation to the least loaded live worker and tell it to start."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT status FROM routes WHERE convo_id = ?", (convo_id,)).fetchone()
+            if row is not None and row[0] not in FINISHED:
+                raise RuntimeError(f"Conversation '{convo_id}' already running")
+            worker = self._db.execute(
+                "SELECT w.worker_id FROM workers w LEFT JOIN routes r "
+                f"ON r.worker_id = w.worker_id AND r.status NOT IN ({FINISHED_PARAMS}) "
+                "WHERE w.heartbeat > ? GROUP BY w.worker_id ORDER BY COUNT(r.convo_id), w.worker_id LIMIT 1",
+                (*FINISHED, time.time() - HEARTBEAT_TIMEOUT),
+            ).fetchone()
+            if worker is None:
+                raise RuntimeError("No live workers")
+            worker_id = worker[0]
+            last_seq = self._db.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM events WHERE convo_id = ?", (convo_id,)
+            ).fetchone()[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, 'starting', 0, ?, NULL)", (convo_id, worker_id, last_seq)
+            )
+            self._db.execute(
+                "INSERT INTO commands (worker_id, convo_id, kind, text) VALUES (?, ?, 'start', ?)",
+                (worker_id, convo_id, query),
+            )
+            return worker_id
+
+    def send(self, convo_id: str, kind: str, text: str = "") -> None:
+        with self._lock, self._db:
+            row = self._db.execute("SELECT worker_id FROM routes WHERE convo_id = ?", (convo_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown conversation '{convo_id}'")
+            self._db.execute(
+                "INSERT INTO commands (worker_id, convo_id, kind, text) VALUES (?, ?, ?, ?)",
+                (row[0], convo_id, kind, text),
+            )
+
+    def send_worker(self, worker_id: str, kind: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO commands (worker_id, kind) VALUES (?, ?)", (worker_id, kind))
+
+    def route(self, convo_id: str) -> Optional[tuple[str, str, int, int]]:
+        """(worker_id, status, phase_index, last_seq) for a conversation."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT worker_id, status, phase_index, last_seq FROM routes WHERE convo_id = ?", (convo_id,)
+            ).fetchone()
+
+    def read_events(self, convo_id: str, after: int, limit: int = 1000) -> list[ProgressEvent]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT timestamp, event_type, message, seq FROM events "
+                "WHERE convo_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (convo_id, after, limit),
+            ).fetchall()
+        return [ProgressEvent(*row) for row in rows]
+
+    def live_workers(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT worker_id, pid FROM workers WHERE heartbeat > ?", (time.time() - HEARTBEAT_TIMEOUT,)
+            ).fetchall()
+        return dict(rows)
+
+    # ---------- Workers ----------
+    def register(self, worker_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO workers VALUES (?, ?, ?)", (worker_id, os.getpid(), time.time()))
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("UPDATE workers SET heartbeat = ? WHERE worker_id = ?", (time.time(), worker_id))
+
+    def unregister(self, worker_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def take_commands(self, worker_id: str) -> list[tuple[Optional[str], str, str]]:
+        """Pop this worker's pending commands as (convo_id, kind, text), oldest first."""
+        with self._lock, self._db:
+            rows = self._db.execute(
+                "SELECT id, convo_id, kind, text FROM commands WHERE worker_id = ? ORDER BY id", (worker_id,)
+            ).fetchall()
+            if rows:
+                self._db.execute("DELETE FROM commands WHERE worker_id = ? AND id <= ?", (worker_id, rows[-1][0]))
+        return [(convo_id, kind, text) for _, convo_id, kind, text in rows]
+
+    def owned(self, worker_id: str) -> list[tuple[str, int]]:
+        """Unfinished conversations routed to this worker, with their last stored seq.
+
+        Routes still waiting on their queued 'start' command are left out: that command
+        starts them, and there is nothing to resume yet.
+        """
+        with self._lock:
+            return self._db.execute(
+                f"SELECT convo_id, last_seq FROM routes WHERE worker_id = ? AND status NOT IN ({FINISHED_PARAMS}) "
+                "AND NOT (status = 'starting' AND convo_id IN "
+                "(SELECT convo_id FROM commands WHERE worker_id = ? AND kind = 'start'))",
+                (worker_id, *FINISHED, worker_id),
+            ).fetchall()
+
+    def publish(self, convo_id: str, events: list[ProgressEvent], status: str, phase_index: int) -> None:
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)",
+                [(convo_id, evt.seq, evt.timestamp, evt.event_type, evt.message) for evt in events],
+            )
+            self._db.execute(
+                "UPDATE routes SET status = ?, phase_index = ?, last_seq = MAX(last_seq, ?), "
+                "finished_at = CASE WHEN ? THEN COALESCE(finished_at, ?) END WHERE convo_id = ?",
+                (status, phase_index, events[-1].seq if events else 0, status in FINISHED, time.time(), convo_id),
+            )
+
+    def prune(self, retention: float) -> int:
+        """Forget conversations that finished over `retention` seconds ago, with their events.
+
+        Returns how many were removed; their ids become unknown and can be started again.
+        """
+        with self._lock, self._db:
+            cutoff = time.time() - retention
+            self._db.execute(
+                "DELETE FROM events WHERE convo_id IN (SELECT convo_id FROM routes WHERE finished_at < ?)", (cutoff,)
+            )
+            return self._db.execute("DELETE FROM routes WHERE finished_at < ?", (cutoff,)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def run_worker(
+    broker_path: str,
+    worker_id: str,
+    checkpoint_path: Optional[str] = None,
+    num_loops: int = 1,
+    poll_interval: float = 0.05,
+) -> None:
+    """Worker process main loop: apply routed commands, publish events, heartbeat."""
+    broker = Broker(broker_path)
+    checkpoints = CheckpointStore(checkpoint_path) if checkpoint_path else None
+    system = InMemoryAgentSystem(loop_pool=EventLoopPool(num_loops), checkpoints=checkpoints)
+    # convo_id -> (runtime cursor, offset added to runtime seqs so they continue the stored ones)
+    live: dict[str, tuple[int, int]] = {}
+
+    # Conversations this worker owned before it was restarted
+    for convo_id, last_seq in broker.owned(worker_id):
+        try:
+            system.resume(convo_id)
+        except (KeyError, RuntimeError) as e:
+            _publish_unresumable(broker, checkpoints, convo_id, last_seq, e)
+            continue
+        live[convo_id] = (0, last_seq)
+    broker.register(worker_id)
+
+    try:
+        while True:
+            for convo_id, kind, text in broker.take_commands(worker_id):
+                if kind == "stop":
+                    return
+                if convo_id is None:
+                    continue
+                try:
+                    if kind == "start":
+                        route = broker.route(convo_id)
+                        system.start(convo_id, text)
+                        live[convo_id] = (0, route[3] if route else 0)
+                    elif kind == "cancel":
+                        system.cancel(convo_id)
+                    else:
+                        system.queue(convo_id, Message(kind=kind, text=text))
+                except (KeyError, RuntimeError):
+                    pass  # finished or unknown here; nothing to route to
+
+            for convo_id, (cursor, offset) in list(live.items()):
+                runtime = system.get_runtime(convo_id)
+                events, _ = runtime.read_since(cursor, timeout=0)
+                # Status and phase changes always come with an event, so quiet ticks skip the write
+                if events:
+                    cursor = events[-1].seq
+                    events = [
+                        ProgressEvent(evt.timestamp, evt.event_type, evt.message, evt.seq + offset) for evt in events
+                    ]
+                    broker.publish(convo_id, events, runtime.status, runtime.phase_index)
+                if runtime.status in FINISHED and runtime.last_seq <= cursor:
+                    del live[convo_id]
+                else:
+                    live[convo_id] = (cursor, offset)
+
+            broker.heartbeat(worker_id)
+            time.sleep(poll_interval)
+    finally:
+        broker.unregister(worker_id)
+
+
+def _publish_unresumable(
+    broker: Broker, checkpoints: Optional[CheckpointStore], convo_id: str, last_seq: int, error: Exception
+) -> None:
+    """Finish a conversation the restarted worker cannot pick up, saying why on its stream."""
+    checkpoint = checkpoints.load(convo_id) if checkpoints is not None else None
+    if checkpoint is not None and checkpoint.status == "cancelled":
+        status, message = "cancelled", "Cancelled before the worker restarted"
+    else:
+        status, message = "error", f"Lost in a worker restart and could not be resumed: {error}"
+    route = broker.route(convo_id)
+    now = time.monotonic()
+    events = [ProgressEvent(now, "error", message, last_seq + 1), ProgressEvent(now, "done", status, last_seq + 2)]
+    broker.publish(convo_id, events, status, route[2] if route else 0)
+
+
+class RemoteSubscription:
+    """`Subscription` counterpart for a `RemoteConversation`: a seq cursor over the broker.
+
+    The broker keeps every event until the conversation is pruned, so a slow consumer
+    just reads further behind; nothing is coalesced or dropped. Gaps only show up where
+    events were pruned.
+    """
+
+    def __init__(self, conversation: RemoteConversation, after: int, max_pending: int = 256) -> None:
+        self.conversation = conversation
+        self.cursor = after
+        self.max_pending = max_pending
+        self.closed = False
+
+    async def get(self) -> list[ProgressEvent]:
+        """Wait for and take the next events; returns [] once closed."""
+        return [evt for _, evt in await self.get_with_gaps()]
+
+    async def get_with_gaps(self) -> list[tuple[int, ProgressEvent]]:
+        """Like `get`, pairing each event with the number of seqs missing right before it."""
+        while not self.closed:
+            events = self.conversation.broker.read_events(self.conversation.convo_id, self.cursor, self.max_pending)
+            if events:
+                entries = []
+                for evt in events:
+                    entries.append((evt.seq - self.cursor - 1, evt))
+                    self.cursor = evt.seq
+                return entries
+            await asyncio.sleep(self.conversation.poll_interval)
+        return []
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class RemoteConversation:
+    """Read side of a conversation owned by a worker process, shaped like ConversationRuntime."""
+
+    def __init__(self, broker: Broker, convo_id: str, poll_interval: float = 0.05) -> None:
+        self.broker = broker
+        self.convo_id = convo_id
+        self.poll_interval = poll_interval
+
+    def _route(self) -> tuple[str, str, int, int]:
+        route = self.broker.route(self.convo_id)
+        if route is None:
+            raise KeyError(f"Unknown conversation '{self.convo_id}'")
+        return route
+
+    @property
+    def status(self) -> str:
+        return self._route()[1]
+
+    @property
+    def phase_index(self) -> int:
+        return self._route()[2]
+
+    @property
+    def last_seq(self) -> int:
+        return self._route()[3]
+
+    def read_since(self, seq: int, timeout: Optional[float] = None) -> tuple[list[ProgressEvent], bool]:
+        """Events after `seq`, polling the broker for up to `timeout`. The broker keeps
+        every event until the conversation is pruned, so the missed flag is rarely set."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            events = self._read_all(seq)
+            if events or (deadline is not None and time.monotonic() >= deadline):
+                return events, bool(events) and events[0].seq > seq + 1
+            time.sleep(self.poll_interval)
+
+    def _read_all(self, seq: int, page_size: int = 1000) -> list[ProgressEvent]:
+        events: list[ProgressEvent] = []
+        while True:
+            page = self.broker.read_events(self.convo_id, seq, page_size)
+            events.extend(page)
+            if len(page) < page_size:
+                return events
+            seq = page[-1].seq
+
+    def subscribe(self, max_pending: int = 256, policy: str = "coalesce") -> RemoteSubscription:
+        """Follow events from the current `last_seq` on. `policy` is accepted for parity with
+        `ConversationRuntime.subscribe`; the broker never needs to coalesce or drop."""
+        if policy not in ("coalesce", "drop"):
+            raise ValueError(f"Unknown subscription policy '{policy}'")
+        return RemoteSubscription(self, self.last_seq, max_pending)
+
+    def unsubscribe(self, subscription: RemoteSubscription) -> None:
+        subscription.close()
+
+
+class MultiProcessAgentSystem:
+    """Same interface as InMemoryAgentSystem, with conversations run by worker processes.
+
+    Each worker runs an InMemoryAgentSystem on `loops_per_worker` shared event loops, so
+    research throughput scales with `num_workers` instead of being bound to one GIL.
+    """
+
+    def __init__(
+        self,
+        broker_path: str | Path,
+        num_workers: Optional[int] = None,
+        loops_per_worker: int = 1,
+        checkpoint_path: Optional[str | Path] = None,
+        startup_timeout: float = 60.0,
+        retention: float = 3600.0,
+    ) -> None:
+        self.broker_path = str(broker_path)
+        self.checkpoint_path = str(checkpoint_path) if checkpoint_path is not None else None
+        self.loops_per_worker = loops_per_worker
+        # Seconds a finished conversation stays readable before `supervise` prunes it
+        self.retention = retention
+        self.broker = Broker(self.broker_path)
+        self._context = get_context("spawn")
+        self._workers: dict[str, Any] = {}
+        for i in range(num_workers or os.cpu_count() or 1):
+            self._spawn(f"worker-{i}")
+
+        deadline = time.monotonic() + startup_timeout
+        while len(set(self.broker.live_workers()) & set(self._workers)) < len(self._workers):
+            if time.monotonic() > deadline:
+                raise RuntimeError("Workers did not start in time")
+            time.sleep(0.05)
+
+    def _spawn(self, worker_id: str) -> None:
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.broker_path, worker_id, self.checkpoint_path, self.loops_per_worker),
+            name=worker_id,
+            daemon=True,
+        )
+        process.start()
+        self._workers[worker_id] = process
+
+    def start(self, convo_id: str, query: str) -> RemoteConversation:
+        self.broker.assign(convo_id, query)
+        return RemoteConversation(self.broker, convo_id)
+
+    def queue(self, convo_id: str, msg: Message) -> None:
+        self.broker.send(convo_id, msg.kind, msg.text)
+
+    def cancel(self, convo_id: str) -> None:
+        self.broker.send(convo_id, "cancel")
+
+    def get_runtime(self, convo_id: str) -> RemoteConversation:
+        runtime = RemoteConversation(self.broker, convo_id)
+        runtime.status  # raises KeyError for unknown conversations
+        return runtime
+
+    def is_done(self, convo_id: str) -> bool:
+        return self.get_runtime(convo_id).status in FINISHED
+
+    def supervise(self) -> list[str]:
+        """Restart workers whose process exited and prune expired conversations; returns the
+        restarted worker ids. Call periodically."""
+        restarted = []
+        for worker_id, process in list(self._workers.items()):
+            if not process.is_alive():
+                self._spawn(worker_id)
+                restarted.append(worker_id)
+        self.broker.prune(self.retention)
+        return restarted
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        for worker_id in self._workers:
+            self.broker.send_worker(worker_id, "stop")
+        for process in self._workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._workers.clear()
+
+
+__all__ = [
+    "Broker",
+    "MultiProcessAgentSystem",
+    "RemoteConversation",
+    "RemoteSubscription",
+    "run_worker",
+]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from agents.planner_agent import WebSearchItem, WebSearchPlan
+from agents.writer_agent import ReportData
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    convo_id TEXT PRIMARY KEY,
+    initial_query TEXT NOT NULL,
+    current_query TEXT NOT NULL,
+    phase_index INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'idle',
+    plan TEXT,
+    report TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_summaries (
+    convo_id TEXT NOT NULL,
+    query TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (convo_id, query, reason)
+);
+CREATE TABLE IF NOT EXISTS pending_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    convo_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class Checkpoint:
+    convo_id: str
+    initial_query: str
+    current_query: str
+    phase_index: int
+    status: str
+    plan: Optional[WebSearchPlan] = None
+    # (query, reason) -> summary for every search that finished under `plan`
+    summaries: dict[tuple[str, str], str] = field(default_factory=dict)
+    report: Optional[ReportData] = None
+    # (kind, text) of messages queued but not yet applied at a phase boundary
+    pending: list[tuple[str, str]] = field(default_factory=list)
+
+
+class CheckpointStore:
+    """Durable record of each conversation's finished phase outputs, in one SQLite file.
+
+    Every write commits immediately, so after a crash `load` returns everything that
+    completed: the plan, each search summary, the report, the working query, the phase
+    and the messages that were queued but not yet applied.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def start(self, convo_id: str, initial_query: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM search_summaries WHERE convo_id = ?", (convo_id,))
+            self._db.execute("DELETE FROM pending_messages WHERE convo_id = ?", (convo_id,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, 0, 'running', NULL, NULL, ?)",
+                (convo_id, initial_query, initial_query, time.time()),
+            )
+
+    def save_state(self, convo_id: str, current_query: str, phase_index: int, status: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE conversations SET current_query = ?, phase_index = ?, status = ?, updated_at = ? "
+                "WHERE convo_id = ?",
+                (current_query, phase_index, status, time.time(), convo_id),
+            )
+
+    def save_status(self, convo_id: str, status: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE conversations SET status = ?, updated_at = ? WHERE convo_id = ?",
+                (status, time.time(), convo_id),
+            )
+
+    def save_plan(self, convo_id: str, plan: WebSearchPlan) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM search_summaries WHERE convo_id = ?", (convo_id,))
+            self._db.execute(
+                "UPDATE conversations SET plan = ?, report = NULL, updated_at = ? WHERE convo_id = ?",
+                (plan.model_dump_json(), time.time(), convo_id),
+            )
+
+    def save_search(self, convo_id: str, item: WebSearchItem, summary: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_summaries VALUES (?, ?, ?, ?)",
+                (convo_id, item.query, item.reason, summary),
+            )
+
+    def save_report(self, convo_id: str, report: ReportData) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE conversations SET report = ?, updated_at = ? WHERE convo_id = ?",
+                (report.model_dump_json(), time.time(), convo_id),
+            )
+
+    def clear_outputs(self, convo_id: str) -> None:
+        """Forget the plan, summaries and report, e.g. after a replan."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM search_summaries WHERE convo_id = ?", (convo_id,))
+            self._db.execute(
+                "UPDATE conversations SET plan = NULL, report = NULL, updated_at = ? WHERE convo_id = ?",
+                (time.time(), convo_id),
+            )
+
+    def push_message(self, convo_id: str, kind: str, text: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO pending_messages (convo_id, kind, text) VALUES (?, ?, ?)",
+                (convo_id, kind, text),
+            )
+
+    def drop_messages(self, convo_id: str, count: int) -> None:
+        """Remove the `count` oldest pending messages once a boundary has applied them."""
+        if count <= 0:
+            return
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM pending_messages WHERE id IN "
+                "(SELECT id FROM pending_messages WHERE convo_id = ? ORDER BY id LIMIT ?)",
+                (convo_id, count),
+            )
+
+    def load(self, convo_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT initial_query, current_query, phase_index, status, plan, report "
+                "FROM conversations WHERE convo_id = ?",
+                (convo_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            summaries = self._db.execute(
+                "SELECT query, reason, summary FROM search_summaries WHERE convo_id = ?", (convo_id,)
+            ).fetchall()
+            pending = self._db.execute(
+                "SELECT kind, text FROM pending_messages WHERE convo_id = ? ORDER BY id", (convo_id,)
+            ).fetchall()
+        initial_query, current_query, phase_index, status, plan, report = row
+        return Checkpoint(
+            convo_id=convo_id,
+            initial_query=initial_query,
+            current_query=current_query,
+            phase_index=phase_index,
+            status=status,
+            plan=WebSearchPlan.model_validate_json(plan) if plan else None,
+            summaries={(query, reason): summary for query, reason, summary in summaries},
+            report=ReportData.model_validate_json(report) if report else None,
+            pending=[(kind, text) for kind, text in pending],
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+__all__ = [
+    "Checkpoint",
+    "CheckpointStore",
+]
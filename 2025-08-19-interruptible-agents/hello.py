@@ -12,7 +12,7 @@ async def main() -> None:
     query = input("What would you like to research? ")
 
     # Start in-memory agent
-    system = InMemoryAgentSystem()
+    system = InMemoryAgentSystem(stream_report=True)
     convo_id = "default"
     runtime = system.start(convo_id, query)
 
@@ -20,21 +20,32 @@ async def main() -> None:
     print_lock = threading.RLock()
 
     def render_loop() -> None:
-        last_index = 0
-        while not system.is_done(convo_id):
-            with runtime.events_cv:
-                runtime.events_cv.wait(timeout=0.25)
-                events = list(runtime.events)
-            # Print new events
+        cursor = 0
+        mid_report = False
+
+        def print_new(timeout: float) -> None:
+            nonlocal cursor, mid_report
+            events, missed = runtime.read_since(cursor, timeout=timeout)
             with print_lock:
-                for evt in events[last_index:]:
+                if missed:
+                    print(f"[gap] skipped {events[0].seq - cursor - 1} events")
+                for evt in events:
+                    if evt.event_type == "report_partial":
+                        # Deltas of the report markdown as it is written
+                        print(evt.message, end="", flush=True)
+                        mid_report = True
+                        continue
+                    if mid_report:
+                        print()
+                        mid_report = False
                     print(f"[{evt.event_type}] {evt.message}")
-                last_index = len(events)
+            if events:
+                cursor = events[-1].seq
+
+        while not system.is_done(convo_id):
+            print_new(timeout=0.25)
         # Flush any remaining events
-        with print_lock:
-            with runtime.events_cv:
-                for evt in list(runtime.events)[last_index:]:
-                    print(f"[{evt.event_type}] {evt.message}")
+        print_new(timeout=0)
 
     t = threading.Thread(target=render_loop, daemon=True)
     t.start()
@@ -4,12 +4,30 @@ import asyncio
 
 from agents.planner_agent import WebSearchItem, WebSearchPlan, plan_searches
 from agents.search_agent import summarize_search_term
-from agents.writer_agent import ReportData, write_research_report
+from agents.writer_agent import ReportData, refine_research_report, stream_research_report, write_research_report
+from search_cache import SearchSummaryCache, search_cache
+from search_executor import SEARCH_CLIENT, SearchExecutor, default_executor
 
 
 class ResearchManager:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        owner: str = "default",
+        executor: SearchExecutor | None = None,
+        cache: SearchSummaryCache | None = None,
+        stream_report: bool = False,
+    ):
+        # Searches from every manager share one executor and summary cache; `owner` is the fairness key
+        self.owner = owner
+        self.executor = executor or default_executor
+        self.cache = cache or search_cache
+        # Stream the report markdown as deltas instead of waiting for the full response
+        self.stream_report = stream_report
+        # Summaries collected by the last _perform_searches, even if it was cancelled
+        self.partial_results: list[str] = []
+        self.pending_searches: set[asyncio.Task[tuple[WebSearchItem, str | None]]] = set()
+        self._searches_total = 0
+        self._searches_completed = 0
 
     async def run(self, query: str) -> None:
         self._print_section(f"Research: {query}")
@@ -21,13 +39,16 @@ class ResearchManager:
         search_results = await self._perform_searches(search_plan)
 
         self._print_info("Writing report...")
+        if self.stream_report:
+            self._print_section("Report")
         report = await self._write_report(query, search_results)
 
         self._print_section("Report Summary")
         print(report.short_summary)
 
-        self._print_section("Report")
-        print(report.markdown_report)
+        if not self.stream_report:
+            self._print_section("Report")
+            print(report.markdown_report)
 
         self._print_section("Follow Up Questions")
         for idx, question in enumerate(report.follow_up_questions, start=1):
@@ -36,32 +57,120 @@ class ResearchManager:
     async def _plan_searches(self, query: str) -> WebSearchPlan:
         return await plan_searches(query)
 
-    async def _perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
-        num_completed = 0
-        total = len(search_plan.searches)
-        tasks = [asyncio.create_task(self._search(item)) for item in search_plan.searches]
-        results = []
-        for task in asyncio.as_completed(tasks):
-            item, result = await task
-            if result is not None:
-                results.append(result)
-                self._print_success(f"{item.query}")
-            else:
-                self._print_error(f"{item.query}")
-            num_completed += 1
-            self._print_progress(num_completed, total)
+    async def _perform_searches(
+        self,
+        search_plan: WebSearchPlan,
+        quorum: int | None = None,
+        deadline: float | None = None,
+        min_results: int = 0,
+    ) -> list[str]:
+        """Run the planned searches and return the summaries that succeeded.
+
+        With `quorum` (number of finished searches) or `deadline` (seconds), return as soon
+        as either is reached and at least `min_results` summaries are in, or nothing is left
+        to wait for; searches still running stay in `pending_searches` and
+        `_perform_late_searches` collects them.
+        """
+        self.pending_searches = {asyncio.create_task(self._search(item)) for item in search_plan.searches}
+        self._searches_total = len(self.pending_searches)
+        self._searches_completed = 0
+        results: list[str] = []
+        self.partial_results = results
+        try:
+            await self._collect_searches(results, quorum, deadline)
+            # Failed searches count towards the quorum, so it can be met with no summaries
+            while len(results) < min_results and self.pending_searches:
+                await self._collect_searches(results, self._searches_completed + 1, None)
+        except BaseException:
+            # On cancellation, stop the in-flight LLM calls instead of letting them finish
+            await self._cancel_pending_searches()
+            raise
+        return list(results)
+
+    async def _perform_late_searches(self) -> list[str]:
+        """Wait for the searches `_perform_searches` left running and return their summaries."""
+        results: list[str] = []
+        try:
+            await self._collect_searches(results, None, None)
+        finally:
+            await self._cancel_pending_searches()
         return results
 
+    async def _collect_searches(self, results: list[str], quorum: int | None, deadline: float | None) -> None:
+        loop = asyncio.get_running_loop()
+        stop_at = None if deadline is None else loop.time() + deadline
+        while self.pending_searches and (quorum is None or self._searches_completed < quorum):
+            timeout = None if stop_at is None else stop_at - loop.time()
+            if timeout is not None and timeout <= 0:
+                break
+            done, self.pending_searches = await asyncio.wait(
+                self.pending_searches, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                item, result = task.result()
+                if result is not None:
+                    results.append(result)
+                    self._record_search(item, result)
+                    self._print_success(f"{item.query}")
+                else:
+                    self._print_error(f"{item.query}")
+                self._searches_completed += 1
+                self._print_progress(self._searches_completed, self._searches_total)
+
+    async def _cancel_pending_searches(self) -> None:
+        tasks, self.pending_searches = self.pending_searches, set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     async def _search(self, item: WebSearchItem) -> tuple[WebSearchItem, str | None]:
         try:
-            summary = await summarize_search_term(term=item.query, reason=item.reason)
+            # Cache hits and shared in-flight calls skip the executor's slots and rate limit
+            summary = await self.cache.get_or_compute(
+                item.query,
+                item.reason,
+                lambda: self.executor.run(
+                    self.owner,
+                    SEARCH_CLIENT,
+                    lambda: summarize_search_term(term=item.query, reason=item.reason),
+                ),
+            )
             return item, summary
         except Exception:
             return item, None
 
+    def _record_search(self, item: WebSearchItem, summary: str) -> None:
+        """Hook called as each search finishes, e.g. to checkpoint it."""
+
     async def _write_report(self, query: str, search_results: list[str]) -> ReportData:
+        if self.stream_report:
+            return await self._stream_report(query, search_results)
         return await write_research_report(query=query, summaries=search_results)
 
+    async def _stream_report(self, query: str, search_results: list[str]) -> ReportData:
+        stream = stream_research_report(query=query, summaries=search_results)
+        written = ""
+        async for partial in stream:
+            written = self._emit_report_delta(written, partial.markdown_report or "")
+        report = await stream.get_final_response()
+        self._emit_report_delta(written, report.markdown_report)
+        return report
+
+    async def _refine_report(self, query: str, report: ReportData, late_results: list[str]) -> ReportData:
+        return await refine_research_report(query=query, report=report, summaries=late_results)
+
+    def _emit_report_delta(self, written: str, markdown: str) -> str:
+        """Print what `markdown` adds to what was already written; returns the new total."""
+        if markdown.startswith(written):
+            if len(markdown) > len(written):
+                self._print_report_delta(markdown[len(written):])
+            return markdown
+        # The parser revised text it had already streamed, so start over
+        self._print_report_reset()
+        if markdown:
+            self._print_report_delta(markdown)
+        return markdown
+
     # ---------- Pretty printing helpers ----------
     def _print_section(self, title: str) -> None:
         line = "=" * max(12, len(title) + 4)
@@ -81,6 +190,12 @@ class ResearchManager:
     def _print_progress(self, completed: int, total: int) -> None:
         print(f"    progress: {completed}/{total}")
 
+    def _print_report_delta(self, delta: str) -> None:
+        print(delta, end="", flush=True)
+
+    def _print_report_reset(self) -> None:
+        print("\n[report restarted]")
+
     def _print_planned_searches(self, plan: WebSearchPlan) -> None:
         self._print_section(f"Planned Searches ({len(plan.searches)})")
         for idx, item in enumerate(plan.searches, start=1):
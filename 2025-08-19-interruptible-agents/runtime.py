@@ -1,21 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import math
+import sys
 import threading
 import time
+import traceback
 from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass
 from queue import Queue, Empty
-from typing import Deque, Optional
+from typing import Any, Awaitable, Callable, Coroutine, Deque, Optional, TypeVar
 
+from agents.planner_agent import WebSearchItem, WebSearchPlan
+from agents.writer_agent import ReportData
+from checkpoint import Checkpoint, CheckpointStore
 from manager import ResearchManager
 
+T = TypeVar("T")
+
+# Terminal conversation statuses; "error" means the run raised
+FINISHED = ("done", "cancelled", "error")
+
 
 @dataclass
 class ProgressEvent:
     timestamp: float
     event_type: str
     message: str
+    seq: int = 0  # 1-based, increasing per conversation
 
 
 @dataclass
@@ -24,22 +37,199 @@ class Message:
     text: str = ""
 
 
+@dataclass(frozen=True)
+class Pipeline:
+    """Start writing once `quorum` (a fraction of the planned searches) has finished or
+    `deadline_s` has passed, then fold later results in with a refinement pass."""
+
+    quorum: float = 0.75
+    deadline_s: Optional[float] = None
+
+
+# Event types whose payloads can be merged when a subscriber falls behind
+COALESCE_APPEND = {"report_partial"}  # concatenate deltas
+COALESCE_LATEST = {"progress"}  # keep only the newest
+
+
+class Subscription:
+    """A bounded, push-fed event buffer for one consumer of a `ConversationRuntime`.
+
+    `emit` pushes into it from whichever thread the agent runs on and wakes the consumer
+    on its own event loop, so consumers need no polling thread. When the buffer is full,
+    the "coalesce" policy merges runs of mergeable events (see COALESCE_APPEND /
+    COALESCE_LATEST) and, failing that, drops the oldest event that is not a report
+    delta, so the rebuilt markdown stays intact. The "drop" policy always drops the
+    oldest event. Drops are counted in `dropped` and reported where they happened by
+    `get_with_gaps`.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int = 256, policy: str = "coalesce") -> None:
+        if policy not in ("coalesce", "drop"):
+            raise ValueError(f"Unknown subscription policy '{policy}'")
+        self.loop = loop
+        self.max_pending = max_pending
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        # [events dropped just before this one, event]
+        self._buffer: Deque[list[Any]] = deque()
+        self._lock = threading.Lock()
+        self._waiter: Optional[asyncio.Future[None]] = None
+
+    def push(self, evt: ProgressEvent) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            if len(self._buffer) < self.max_pending:
+                self._buffer.append([0, evt])
+            elif not self._merge_into_last(evt):
+                freed = self.policy == "coalesce" and self._merge_adjacent()
+                missed = 0 if freed else self._evict()
+                self._buffer.append([missed, evt])
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            self._wake(waiter)
+
+    @staticmethod
+    def _merge(first: ProgressEvent, second: ProgressEvent) -> Optional[ProgressEvent]:
+        if first.event_type != second.event_type:
+            return None
+        if second.event_type in COALESCE_APPEND:
+            return ProgressEvent(second.timestamp, second.event_type, first.message + second.message, second.seq)
+        if second.event_type in COALESCE_LATEST:
+            return second
+        return None
+
+    def _merge_into_last(self, evt: ProgressEvent) -> bool:
+        if self.policy != "coalesce" or not self._buffer:
+            return False
+        merged = self._merge(self._buffer[-1][1], evt)
+        if merged is None:
+            return False
+        self._buffer[-1][1] = merged
+        return True
+
+    def _merge_adjacent(self) -> bool:
+        """Merge the oldest mergeable pair of neighbours to free one slot."""
+        for i in range(len(self._buffer) - 1):
+            missed, following = self._buffer[i + 1]
+            merged = self._merge(self._buffer[i][1], following)
+            if merged is not None:
+                # A gap between the two moves ahead of the merged event
+                self._buffer[i][0] += missed
+                self._buffer[i][1] = merged
+                del self._buffer[i + 1]
+                return True
+        return False
+
+    def _evict(self) -> int:
+        """Drop one event; returns the gap the next pushed event inherits (0 if none)."""
+        index = 0
+        if self.policy == "coalesce":
+            # Deltas only make sense together, so lose anything else first
+            index = next(
+                (i for i, (_, evt) in enumerate(self._buffer) if evt.event_type not in COALESCE_APPEND),
+                0,
+            )
+        missed, _ = self._buffer[index]
+        del self._buffer[index]
+        self.dropped += 1
+        if index < len(self._buffer):
+            self._buffer[index][0] += missed + 1
+            return 0
+        return missed + 1
+
+    async def get(self) -> list[ProgressEvent]:
+        """Wait for and take everything buffered; returns [] once closed and drained."""
+        return [evt for _, evt in await self.get_with_gaps()]
+
+    async def get_with_gaps(self) -> list[tuple[int, ProgressEvent]]:
+        """Like `get`, pairing each event with the number of events dropped right before it."""
+        while True:
+            with self._lock:
+                if self._buffer or self.closed:
+                    entries = [(missed, evt) for missed, evt in self._buffer]
+                    self._buffer.clear()
+                    return entries
+                waiter = self._waiter = self.loop.create_future()
+            await waiter
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            self._wake(waiter)
+
+    def _wake(self, waiter: asyncio.Future[None]) -> None:
+        def wake() -> None:
+            if not waiter.done():
+                waiter.set_result(None)
+
+        try:
+            self.loop.call_soon_threadsafe(wake)
+        except RuntimeError:
+            pass  # consumer loop already closed
+
+
 class ConversationRuntime:
     def __init__(self, convo_id: str, max_events: int = 500) -> None:
         self.convo_id = convo_id
         self.message_queue: Queue[Message] = Queue()
         self.events: Deque[ProgressEvent] = deque(maxlen=max_events)
         self.events_cv = threading.Condition()
+        self.last_seq = 0
         self.lock = threading.RLock()
         self.cancel_event = threading.Event()
         self.new_msg_event = threading.Event()
         self.phase_index: int = 0
         self.status: str = "idle"
+        # Summaries that finished before a search phase was interrupted
+        self.partial_results: list[str] = []
+        self._interrupt_listeners: list[Callable[[], None]] = []
+        self._subscribers: list[Subscription] = []
 
     def emit(self, event_type: str, message: str) -> None:
         with self.events_cv:
-            self.events.append(ProgressEvent(time.monotonic(), event_type, message))
+            self.last_seq += 1
+            evt = ProgressEvent(time.monotonic(), event_type, message, self.last_seq)
+            self.events.append(evt)
             self.events_cv.notify_all()
+            for subscription in self._subscribers:
+                subscription.push(evt)
+
+    def subscribe(self, max_pending: int = 256, policy: str = "coalesce") -> Subscription:
+        """Push every future event to a new `Subscription` on the running event loop."""
+        subscription = Subscription(asyncio.get_running_loop(), max_pending, policy)
+        with self.events_cv:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self.events_cv:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        subscription.close()
+
+    def read_since(self, seq: int, timeout: Optional[float] = None) -> tuple[list[ProgressEvent], bool]:
+        """Events with a sequence number above `seq`, waiting up to `timeout` for one.
+
+        The flag is True when events after `seq` were already dropped from the bounded
+        buffer, i.e. the caller fell behind and missed some. Pass the last returned
+        event's `seq` as the next cursor; 0 reads from the beginning.
+        """
+        with self.events_cv:
+            if self.last_seq <= seq and timeout != 0:
+                self.events_cv.wait_for(lambda: self.last_seq > seq, timeout)
+            # Walk back from the newest event so the cost is the number of new events
+            new: list[ProgressEvent] = []
+            for evt in reversed(self.events):
+                if evt.seq <= seq:
+                    break
+                new.append(evt)
+            new.reverse()
+            missed = bool(new) and new[0].seq > seq + 1
+            return new, missed
 
     def queue_message(self, msg: Message) -> None:
         if msg.kind == "cancel":
@@ -47,12 +237,46 @@ class ConversationRuntime:
         else:
             self.message_queue.put(msg)
             self.new_msg_event.set()
+        # Info is merged at the next boundary; cancel and replan abort the running phase.
+        # An empty replan changes nothing at the boundary, so it is not worth an abort.
+        if msg.kind == "cancel" or (msg.kind == "replan" and msg.text):
+            self.interrupt()
+
+    def add_interrupt_listener(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call `callback` (from any thread) on cancel or replan. Returns a remover."""
+        with self.lock:
+            self._interrupt_listeners.append(callback)
+
+        def remove() -> None:
+            with self.lock:
+                if callback in self._interrupt_listeners:
+                    self._interrupt_listeners.remove(callback)
+
+        return remove
+
+    def interrupt(self) -> None:
+        with self.lock:
+            listeners = list(self._interrupt_listeners)
+        for callback in listeners:
+            callback()
 
 
 class RuntimeAwareResearchManager(ResearchManager):
-    def __init__(self, runtime: ConversationRuntime) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        runtime: ConversationRuntime,
+        checkpoints: Optional[CheckpointStore] = None,
+        stream_report: bool = False,
+    ) -> None:
+        super().__init__(owner=runtime.convo_id, stream_report=stream_report)
         self.runtime = runtime
+        self.checkpoints = checkpoints
+        # Set once any report_partial went out, so a rewritten report starts with a reset
+        self.report_deltas_sent = False
+
+    def _record_search(self, item: WebSearchItem, summary: str) -> None:  # type: ignore[override]
+        if self.checkpoints is not None:
+            self.checkpoints.save_search(self.runtime.convo_id, item, summary)
 
     # Override printing helpers to route to event stream
     def _print_section(self, title: str) -> None:  # type: ignore[override]
@@ -70,86 +294,260 @@ class RuntimeAwareResearchManager(ResearchManager):
     def _print_progress(self, completed: int, total: int) -> None:  # type: ignore[override]
         self.runtime.emit("progress", f"{completed}/{total}")
 
-
-class AgentThread(threading.Thread):
-    def __init__(self, runtime: ConversationRuntime, initial_query: str) -> None:
-        super().__init__(daemon=True)
+    def _print_report_delta(self, delta: str) -> None:  # type: ignore[override]
+        self.report_deltas_sent = True
+        self.runtime.emit("report_partial", delta)
+
+    def _print_report_reset(self) -> None:  # type: ignore[override]
+        self.runtime.emit("report_reset", "")
+
+
+class AgentRun:
+    """The research phases for one conversation, as a coroutine.
+
+    Every phase boundary is an await point, so the same run can be driven by a dedicated
+    thread (`AgentThread`) or as one task among many on a shared loop (`EventLoopPool`).
+
+    With a `CheckpointStore`, each phase output is saved as it completes; pass the loaded
+    `Checkpoint` to continue from the last completed phase instead of starting over.
+    With `stream_report`, the report markdown goes out as `report_partial` delta events
+    while it is generated instead of one `report_markdown` event at the end. With a
+    `Pipeline`, the first report is written from a quorum of the searches and a refined
+    one follows once the rest finish.
+    """
+
+    def __init__(
+        self,
+        runtime: ConversationRuntime,
+        initial_query: str,
+        checkpoints: Optional[CheckpointStore] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        stream_report: bool = False,
+        pipeline: Optional[Pipeline] = None,
+    ) -> None:
         self.runtime = runtime
+        self.stream_report = stream_report
+        self.pipeline = pipeline
         self.initial_query = initial_query
-        self.current_query = initial_query
+        self.current_query = initial_query if checkpoint is None else checkpoint.current_query
+        self.checkpoints = checkpoints
+        self._plan = checkpoint.plan if checkpoint is not None else None
+        self._summaries = dict(checkpoint.summaries) if checkpoint is not None else {}
+        self._report = checkpoint.report if checkpoint is not None else None
         self._stopped = threading.Event()
 
     def stop(self) -> None:
         self._stopped.set()
+        self.runtime.interrupt()
 
-    def run(self) -> None:  # noqa: C901 - keep simple even if a bit long
-        mgr = RuntimeAwareResearchManager(self.runtime)
+    async def run(self) -> None:
+        mgr = RuntimeAwareResearchManager(self.runtime, self.checkpoints, self.stream_report)
 
-        # Dedicated asyncio loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        self.runtime.status = "running"
+        self.runtime.emit("start", f"Research: {self.initial_query}")
 
         try:
-            self.runtime.status = "running"
-            self.runtime.emit("start", f"Research: {self.initial_query}")
-
-            # Phase 1: Planning
-            if self._boundary_check():
-                self._finish("cancelled")
-                return
-            self.runtime.phase_index = 1
-            self.runtime.emit("phase", "Planning searches...")
-            search_plan = loop.run_until_complete(mgr._plan_searches(self.current_query))
-            # Provide a structured echo similar to original manager
-            self.runtime.emit("section", f"Planned Searches ({len(search_plan.searches)})")
-            for item in search_plan.searches:
-                self.runtime.emit("plan_item", f"{item.query} — {item.reason}")
-
-            # Phase 2: Searches
-            if self._boundary_check():
-                self._finish("cancelled")
-                return
-            self.runtime.phase_index = 2
-            self.runtime.emit("phase", f"Running {len(search_plan.searches)} searches...")
-            search_results = loop.run_until_complete(mgr._perform_searches(search_plan))
-
-            # Phase 3: Write report
-            if self._boundary_check():
-                self._finish("cancelled")
-                return
-            self.runtime.phase_index = 3
-            self.runtime.emit("phase", "Writing report...")
-            report = loop.run_until_complete(mgr._write_report(self.current_query, search_results))
-
-            # Output
-            self.runtime.emit("section", "Report Summary")
-            self.runtime.emit("report_summary", report.short_summary)
+            # A replan, mid-phase or at a boundary, starts over from planning with the new query
+            while (status := await self._research(mgr)) == "replan":
+                pass
+        except Exception as e:
+            # Leave a terminal status and event behind, or watchers wait forever
+            self.runtime.emit("error", f"Run failed: {type(e).__name__}: {e}")
+            self._finish("error")
+            raise
+        self._finish(status)
+
+    async def _research(self, mgr: RuntimeAwareResearchManager) -> str:
+        """Run the phases once; returns "done", "error", "cancelled" or "replan"."""
+        try:
+            return await self._phases(mgr)
+        finally:
+            # Late searches of a pipelined run that stopped before collecting them
+            await mgr._cancel_pending_searches()
+
+    async def _phases(self, mgr: RuntimeAwareResearchManager) -> str:  # noqa: C901 - keep simple even if a bit long
+        # Phase 1: Planning
+        if stop := await self._boundary():
+            return stop
+        self._enter_phase(1)
+        self.runtime.emit("phase", "Planning searches...")
+        search_plan = self._plan
+        if search_plan is not None:
+            self.runtime.emit("resume", "Reusing checkpointed search plan")
+        else:
+            search_plan = await self._interruptible(mgr._plan_searches(self.current_query))
+            if search_plan is None:
+                return await self._interrupted()
+            self._plan = search_plan
+            if self.checkpoints is not None:
+                self.checkpoints.save_plan(self.runtime.convo_id, search_plan)
+        # Provide a structured echo similar to original manager
+        self.runtime.emit("section", f"Planned Searches ({len(search_plan.searches)})")
+        for item in search_plan.searches:
+            self.runtime.emit("plan_item", f"{item.query} — {item.reason}")
+
+        # Phase 2: Searches
+        if stop := await self._boundary():
+            return stop
+        self._enter_phase(2)
+        self.runtime.emit("phase", f"Running {len(search_plan.searches)} searches...")
+        reused = [
+            self._summaries[(item.query, item.reason)]
+            for item in search_plan.searches
+            if (item.query, item.reason) in self._summaries
+        ]
+        remaining = [item for item in search_plan.searches if (item.query, item.reason) not in self._summaries]
+        if reused:
+            self.runtime.emit("resume", f"Reusing {len(reused)} checkpointed search summaries")
+        quorum = deadline = None
+        if self.pipeline is not None:
+            quorum = max(0, math.ceil(self.pipeline.quorum * len(search_plan.searches)) - len(reused))
+            deadline = self.pipeline.deadline_s
+        # Past the quorum or deadline, still hold the writer until there is something to write from
+        search_results = await self._interruptible(
+            mgr._perform_searches(WebSearchPlan(searches=remaining), quorum, deadline, 0 if reused else 1)
+        )
+        if search_results is None:
+            self.runtime.partial_results = reused + mgr.partial_results
+            self.runtime.emit("partial", f"Kept {len(self.runtime.partial_results)} completed search summaries")
+            return await self._interrupted()
+        search_results = reused + search_results
+        if search_plan.searches and not search_results:
+            self.runtime.emit("no_results", f"All {len(search_plan.searches)} searches failed; no report written")
+            return "error"
+        if mgr.pending_searches:
+            self.runtime.emit(
+                "pipeline",
+                f"Writing from {len(search_results)} summaries, {len(mgr.pending_searches)} searches still running",
+            )
+
+        # Phase 3: Write report
+        if stop := await self._boundary():
+            return stop
+        self._enter_phase(3)
+        self.runtime.emit("phase", "Writing report...")
+        report = self._report
+        streamed = False
+        if report is not None:
+            self.runtime.emit("resume", "Reusing checkpointed report")
+        else:
+            if self.stream_report:
+                self.runtime.emit("section", "Report")
+                if mgr.report_deltas_sent:
+                    # An earlier write was interrupted mid-stream; its deltas are void
+                    self.runtime.emit("report_reset", "")
+            report = await self._interruptible(mgr._write_report(self.current_query, search_results))
+            if report is None:
+                return await self._interrupted()
+            streamed = self.stream_report
+            self._report = report
+            if self.checkpoints is not None:
+                self.checkpoints.save_report(self.runtime.convo_id, report)
+
+        self._emit_report(report, streamed)
+
+        # Pipelined: fold in the searches that finished after the quorum
+        if mgr.pending_searches:
+            self.runtime.emit("phase", f"Waiting for {len(mgr.pending_searches)} late searches...")
+            late_results = await self._interruptible(mgr._perform_late_searches())
+            if late_results is None:
+                return await self._interrupted()
+            if late_results:
+                self.runtime.emit("phase", f"Refining report with {len(late_results)} late search summaries...")
+                refined = await self._interruptible(mgr._refine_report(self.current_query, report, late_results))
+                if refined is None:
+                    return await self._interrupted()
+                self._report = refined
+                if self.checkpoints is not None:
+                    self.checkpoints.save_report(self.runtime.convo_id, refined)
+                self.runtime.emit("section", "Refined Report")
+                if self.stream_report:
+                    # Keep delta consumers consistent: the refined text replaces what they have
+                    self.runtime.emit("report_reset", "")
+                    self.runtime.emit("report_partial", refined.markdown_report)
+                self._emit_report(refined, self.stream_report)
+
+        return "done"
+
+    def _emit_report(self, report: ReportData, streamed: bool) -> None:
+        self.runtime.emit("section", "Report Summary")
+        self.runtime.emit("report_summary", report.short_summary)
+        if not streamed:
             self.runtime.emit("section", "Report")
             self.runtime.emit("report_markdown", report.markdown_report)
-            self.runtime.emit("section", "Follow Up Questions")
-            for idx, q in enumerate(report.follow_up_questions, start=1):
-                self.runtime.emit("follow_up", f"{idx}. {q}")
-
-            self._finish("done")
-        finally:
+        self.runtime.emit("section", "Follow Up Questions")
+        for idx, q in enumerate(report.follow_up_questions, start=1):
+            self.runtime.emit("follow_up", f"{idx}. {q}")
+
+    async def _interruptible(self, phase: Awaitable[T]) -> Optional[T]:
+        """Await a phase as its own task, cancelling it on cancel or replan.
+
+        Returns None if the phase was interrupted. Cancelling the run itself still
+        propagates as CancelledError.
+        """
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(phase)
+        interrupted = threading.Event()
+
+        def interrupt() -> None:
+            interrupted.set()
             try:
-                loop.run_until_complete(loop.shutdown_asyncgens())
-            finally:
-                loop.close()
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # loop already closed
 
-    def _boundary_check(self) -> bool:
-        """Return True if should stop (cancelled). Drain and apply messages otherwise."""
+        remove = self.runtime.add_interrupt_listener(interrupt)
+        # A cancel that landed after the boundary check but before we started listening
         if self.runtime.cancel_event.is_set() or self._stopped.is_set():
-            return True
+            interrupt()
+        try:
+            return await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if not interrupted.is_set() or (current is not None and current.cancelling()):
+                raise
+            return None
+        finally:
+            remove()
+            if not task.done():
+                task.cancel()
+
+    def _enter_phase(self, phase_index: int) -> None:
+        self.runtime.phase_index = phase_index
+        if self.checkpoints is not None:
+            self.checkpoints.save_state(self.runtime.convo_id, self.current_query, phase_index, "running")
+
+    async def _interrupted(self) -> str:
+        # The boundary check reports the cancel or applies the replan message
+        if await self._boundary() == "cancelled":
+            return "cancelled"
+        self.runtime.emit("phase", "Interrupted, starting over")
+        return "replan"
+
+    async def _boundary(self) -> Optional[str]:
+        # Yield to the loop so conversations sharing it make progress between phases
+        await asyncio.sleep(0)
+        return self._boundary_check()
+
+    def _boundary_check(self) -> Optional[str]:
+        """Drain and apply queued messages between phases.
+
+        Returns "cancelled" if the run should stop, "replan" if a replan replaced the
+        query (the phases start over from planning), and None to carry on.
+        """
+        if self.runtime.cancel_event.is_set() or self._stopped.is_set():
+            return "cancelled"
 
         # Drain queue non-blocking and coalesce info/replan
         new_instructions: list[str] = []
         saw_replan = False
+        drained = 0
         while True:
             try:
                 msg = self.runtime.message_queue.get_nowait()
             except Empty:
                 break
+            drained += 1
             if msg.kind == "cancel":
                 self.runtime.cancel_event.set()
             elif msg.kind == "replan":
@@ -161,56 +559,232 @@ class AgentThread(threading.Thread):
                     new_instructions.append(msg.text)
 
         if self.runtime.cancel_event.is_set():
-            return True
+            return "cancelled"
 
+        replanned = False
         if new_instructions:
             # Merge instructions by appending to the working query
             merged = "\n".join(new_instructions)
             if saw_replan:
                 # Replace the query semantics on replan
                 self.current_query = merged
+                self._plan, self._summaries, self._report = None, {}, None
+                if self.checkpoints is not None:
+                    self.checkpoints.clear_outputs(self.runtime.convo_id)
                 self.runtime.emit("replan", f"Replanned with new query:")
                 self.runtime.emit("replan_query", self.current_query)
+                replanned = True
             else:
                 # Augment current query context
                 self.current_query = f"{self.current_query}\n\nAdditional instructions:\n{merged}"
                 self.runtime.emit("info_merge", "Merged additional instructions into context")
 
+        if self.checkpoints is not None and drained:
+            self.checkpoints.save_state(
+                self.runtime.convo_id, self.current_query, self.runtime.phase_index, "running"
+            )
+            self.checkpoints.drop_messages(self.runtime.convo_id, drained)
+
         # Clear the "new message" edge trigger if no more pending
         if self.runtime.message_queue.empty():
             self.runtime.new_msg_event.clear()
 
-        return False
+        return "replan" if replanned else None
 
     def _finish(self, status: str) -> None:
+        if self.checkpoints is not None:
+            self.checkpoints.save_state(self.runtime.convo_id, self.current_query, self.runtime.phase_index, status)
         self.runtime.status = status
         self.runtime.emit("done", status)
 
 
+class AgentThread(threading.Thread):
+    def __init__(self, runtime: ConversationRuntime, initial_query: str = "", agent: Optional[AgentRun] = None) -> None:
+        super().__init__(daemon=True)
+        self.runtime = runtime
+        self.agent = agent or AgentRun(runtime, initial_query)
+
+    def stop(self) -> None:
+        self.agent.stop()
+
+    def run(self) -> None:
+        # Dedicated asyncio loop for this thread
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        try:
+            loop.run_until_complete(self.agent.run())
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+
+
+class EventLoopPool:
+    """A few long-lived event loops, each on its own thread, shared by many conversations.
+
+    Conversations are plain tasks, so thousands can be in flight without a thread each.
+    New runs go to the loop with the fewest active runs.
+    """
+
+    def __init__(self, num_loops: int = 1) -> None:
+        self._lock = threading.Lock()
+        self._loops: list[asyncio.AbstractEventLoop] = []
+        self._threads: list[threading.Thread] = []
+        self._active: list[int] = []
+        for i in range(num_loops):
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run_loop, args=(loop,), name=f"agent-loop-{i}", daemon=True)
+            thread.start()
+            self._loops.append(loop)
+            self._threads.append(thread)
+            self._active.append(0)
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def submit(self, coro: Coroutine[Any, Any, None]) -> Future[None]:
+        with self._lock:
+            slot = min(range(len(self._loops)), key=self._active.__getitem__)
+            self._active[slot] += 1
+        future = asyncio.run_coroutine_threadsafe(coro, self._loops[slot])
+        future.add_done_callback(lambda done: self._done(slot, done))
+        return future
+
+    def _done(self, slot: int, future: Future[None]) -> None:
+        with self._lock:
+            self._active[slot] -= 1
+        # Nobody awaits these futures, so report failures like an uncaught thread error
+        if not future.cancelled() and (exc := future.exception()) is not None:
+            print(f"Exception in pooled agent run on loop {slot}:", file=sys.stderr)
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Cancel every run still in flight, let it unwind, then stop and close the loops.
+
+        Cancelled runs release their search slots and in-flight cache entries on the way
+        out; checkpointed ones keep their "running" status, so they can be resumed.
+        """
+        for loop in self._loops:
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_all(), loop).result(timeout)
+            except (TimeoutError, RuntimeError) as e:
+                print(f"Event loop did not wind down cleanly: {e!r}", file=sys.stderr)
+            loop.call_soon_threadsafe(loop.stop)
+        for thread in self._threads:
+            thread.join()
+        for loop in self._loops:
+            loop.close()
+
+    @staticmethod
+    async def _cancel_all() -> None:
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.get_running_loop().shutdown_asyncgens()
+
+
+class AgentTask:
+    """Handle for an `AgentRun` scheduled on an `EventLoopPool`, shaped like `AgentThread`."""
+
+    def __init__(self, agent: AgentRun, future: Future[None]) -> None:
+        self.agent = agent
+        self.future = future
+
+    def stop(self) -> None:
+        self.agent.stop()
+
+    def is_alive(self) -> bool:
+        return not self.future.done()
+
+
 # Registry helpers for single-process usage
 class InMemoryAgentSystem:
-    def __init__(self) -> None:
+    """Registry of conversations in this process.
+
+    By default every conversation gets its own `AgentThread`. Pass an `EventLoopPool` to
+    run them all as tasks on a few shared event loops instead. Pass a `CheckpointStore`
+    to make conversations survive a restart via `resume`.
+    """
+
+    def __init__(
+        self,
+        loop_pool: Optional[EventLoopPool] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        stream_report: bool = False,
+        pipeline: Optional[Pipeline] = None,
+    ) -> None:
         self._convos: dict[str, ConversationRuntime] = {}
-        self._threads: dict[str, AgentThread] = {}
+        self._threads: dict[str, AgentThread | AgentTask] = {}
         self._lock = threading.RLock()
+        self._loop_pool = loop_pool
+        self._checkpoints = checkpoints
+        self._stream_report = stream_report
+        self._pipeline = pipeline
 
     def start(self, convo_id: str, query: str) -> ConversationRuntime:
         with self._lock:
-            if convo_id in self._threads and self._threads[convo_id].is_alive():
-                raise RuntimeError(f"Conversation '{convo_id}' already running")
+            self._require_not_running(convo_id)
+            runtime = ConversationRuntime(convo_id)
+            if self._checkpoints is not None:
+                self._checkpoints.start(convo_id, query)
+            self._launch(AgentRun(runtime, query, self._checkpoints, None, self._stream_report, self._pipeline))
+            return runtime
+
+    def resume(self, convo_id: str) -> ConversationRuntime:
+        """Continue a checkpointed conversation from its last completed phase."""
+        if self._checkpoints is None:
+            raise RuntimeError("resume needs a CheckpointStore")
+        with self._lock:
+            self._require_not_running(convo_id)
+            checkpoint = self._checkpoints.load(convo_id)
+            if checkpoint is None:
+                raise KeyError(f"No checkpoint for conversation '{convo_id}'")
+            if checkpoint.status == "cancelled":
+                raise RuntimeError(f"Conversation '{convo_id}' was cancelled")
             runtime = ConversationRuntime(convo_id)
-            thread = AgentThread(runtime, query)
-            self._convos[convo_id] = runtime
+            runtime.phase_index = checkpoint.phase_index
+            # Already persisted, so go straight to the runtime queue
+            for kind, text in checkpoint.pending:
+                runtime.queue_message(Message(kind=kind, text=text))
+            runtime.emit("resume", f"Resuming from phase {checkpoint.phase_index}")
+            self._launch(
+                AgentRun(
+                    runtime, checkpoint.initial_query, self._checkpoints, checkpoint, self._stream_report, self._pipeline
+                )
+            )
+            return runtime
+
+    def _launch(self, agent: AgentRun) -> None:
+        convo_id = agent.runtime.convo_id
+        self._convos[convo_id] = agent.runtime
+        if self._loop_pool is None:
+            thread = AgentThread(agent.runtime, agent=agent)
             self._threads[convo_id] = thread
             thread.start()
-            return runtime
+        else:
+            self._threads[convo_id] = AgentTask(agent, self._loop_pool.submit(agent.run()))
+
+    def _require_not_running(self, convo_id: str) -> None:
+        if convo_id in self._threads and self._threads[convo_id].is_alive():
+            raise RuntimeError(f"Conversation '{convo_id}' already running")
 
     def queue(self, convo_id: str, msg: Message) -> None:
         runtime = self._require_runtime(convo_id)
+        if self._checkpoints is not None and msg.kind != "cancel":
+            # Persist first, so a boundary never drains a message the store has not seen
+            self._checkpoints.push_message(convo_id, msg.kind, msg.text)
         runtime.queue_message(msg)
 
     def cancel(self, convo_id: str) -> None:
         runtime = self._require_runtime(convo_id)
+        if self._checkpoints is not None:
+            self._checkpoints.save_status(convo_id, "cancelled")
         runtime.queue_message(Message(kind="cancel"))
 
     def get_runtime(self, convo_id: str) -> ConversationRuntime:
@@ -218,7 +792,7 @@ class InMemoryAgentSystem:
 
     def is_done(self, convo_id: str) -> bool:
         rt = self._require_runtime(convo_id)
-        return rt.status in {"done", "cancelled"}
+        return rt.status in FINISHED
 
     def _require_runtime(self, convo_id: str) -> ConversationRuntime:
         with self._lock:
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def cache_key(term: str, reason: str) -> str:
+    return hashlib.sha256(f"{normalize_text(term)}\0{normalize_text(reason)}".encode("utf-8")).hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """The call a waiter was sharing got cancelled; the waiter should try again."""
+
+
+def _settle(future: Future[str], result: Optional[str] = None, exception: Optional[BaseException] = None) -> None:
+    """Complete `future` unless someone else already did."""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)  # type: ignore[arg-type]
+    except InvalidStateError:
+        pass
+
+
+class SearchSummaryCache:
+    """Search summaries keyed on the normalized (term, reason), shared across conversations.
+
+    Lookups go to an in-memory LRU first, then to an optional SQLite file at `db_path`,
+    which survives restarts and can be shared by several processes. Entries expire after
+    `ttl_seconds`. Concurrent misses for the same key, from any thread or event loop,
+    share one in-flight call; a waiter that hears nothing for `wait_timeout` seconds (the
+    leader's loop died, say) stops waiting and makes the call itself.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_seconds: float = 24 * 3600,
+        db_path: Optional[str | Path] = None,
+        wait_timeout: float = 120.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.wait_timeout = wait_timeout
+        self.hits = {"memory": 0, "disk": 0, "shared": 0}
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # key -> (expires_at wall clock, summary); wall clock so disk entries compare too
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._in_flight: dict[str, Future[str]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_summaries ("
+                "key TEXT PRIMARY KEY, term TEXT, reason TEXT, summary TEXT, expires_at REAL)"
+            )
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, term: str, reason: str) -> Optional[str]:
+        key = cache_key(term, reason)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits["memory"] += 1
+                    return entry[1]
+                del self._memory[key]
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT summary, expires_at FROM search_summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._remember(key, row[1], row[0])
+            self.hits["disk"] += 1
+            return row[0]
+
+    def put(self, term: str, reason: str, summary: str) -> None:
+        key = cache_key(term, reason)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, summary)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_summaries VALUES (?, ?, ?, ?, ?)",
+                    (key, term, reason, summary, expires_at),
+                )
+
+    def purge_expired(self) -> None:
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (expires_at, _) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_summaries WHERE expires_at <= ?", (now,))
+
+    async def get_or_compute(self, term: str, reason: str, compute: Callable[[], Awaitable[str]]) -> str:
+        while True:
+            cached = self.get(term, reason)
+            if cached is not None:
+                return cached
+
+            key = cache_key(term, reason)
+            with self._lock:
+                shared = self._in_flight.get(key)
+                if shared is None:
+                    future: Future[str] = Future()
+                    # Running futures ignore cancel(), so one waiter giving up leaves the rest
+                    future.set_running_or_notify_cancel()
+                    self._in_flight[key] = future
+                    self.misses += 1
+                else:
+                    self.hits["shared"] += 1
+            if shared is None:
+                return await self._lead(term, reason, key, future, compute)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(shared), self.wait_timeout)
+            except _LeaderCancelled:
+                continue
+            except asyncio.TimeoutError:
+                self._abandon(key, shared)
+                continue
+
+    def _abandon(self, key: str, shared: Future[str]) -> None:
+        """Give up on a stuck in-flight call so the next caller leads a fresh one."""
+        with self._lock:
+            if self._in_flight.get(key) is shared:
+                del self._in_flight[key]
+        _settle(shared, exception=_LeaderCancelled())
+
+    async def _lead(
+        self,
+        term: str,
+        reason: str,
+        key: str,
+        future: Future[str],
+        compute: Callable[[], Awaitable[str]],
+    ) -> str:
+        try:
+            summary = await compute()
+        except Exception as e:
+            _settle(future, exception=e)
+            raise
+        else:
+            # Hand the result to waiters first; a failed cache write must not strand them
+            _settle(future, result=summary)
+            try:
+                self.put(term, reason, summary)
+            except Exception as e:
+                print(f"Search cache write failed: {e}")
+            return summary
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            # Cancelled, or the loop was torn down mid-call: waiters retry on their own
+            _settle(future, exception=_LeaderCancelled())
+
+    def _remember(self, key: str, expires_at: float, summary: str) -> None:
+        self._memory[key] = (expires_at, summary)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# Set SEARCH_CACHE_PATH to keep summaries on disk across restarts
+search_cache = SearchSummaryCache(db_path=os.environ.get("SEARCH_CACHE_PATH") or None)
+
+
+__all__ = [
+    "SearchSummaryCache",
+    "cache_key",
+    "search_cache",
+]
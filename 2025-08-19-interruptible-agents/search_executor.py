@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# BAML client behind SummarizeSearchTerm (see baml_src/research.baml)
+SEARCH_CLIENT = "WithWebSearch"
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+@dataclass(eq=False)
+class _Waiter:
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future[None]
+    granted: bool = field(default=False)
+
+
+class SearchExecutor:
+    """Process-wide limit on concurrent searches, shared by every ResearchManager.
+
+    At most `max_concurrency` calls run at once. Waiting calls are queued per owner
+    (conversation) and slots are handed out round-robin across owners, so a conversation
+    with many searches cannot starve the others. Calls tagged with a BAML client that has
+    an entry in `rate_limits` also go through that client's token bucket; a call waiting
+    for a token gives its slot back until the token is due.
+
+    Safe to share between threads and event loops: state is guarded by a lock and
+    waiters are woken on their own loop.
+    """
+
+    def __init__(self, max_concurrency: int = 16, rate_limits: Optional[dict[str, TokenBucket]] = None) -> None:
+        self.max_concurrency = max_concurrency
+        self.rate_limits = dict(rate_limits or {})
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: dict[str, deque[_Waiter]] = {}
+        self._owners: deque[str] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def run(self, owner: str, client: str, call: Callable[[], Awaitable[T]]) -> T:
+        await self._acquire(owner)
+        bucket = self.rate_limits.get(client)
+        # Tokens are reserved in slot order, so they stay round-robin across owners, but the
+        # wait for one happens without a slot: other clients' calls can use it meanwhile
+        if bucket is not None and (delay := bucket.reserve()) > 0:
+            self._release()
+            await asyncio.sleep(delay)
+            await self._acquire(owner)
+        try:
+            return await call()
+        finally:
+            self._release()
+
+    async def _acquire(self, owner: str) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self.max_concurrency and not self._owners:
+                self._active += 1
+                return
+            waiter = _Waiter(loop, loop.create_future())
+            if owner not in self._waiters:
+                self._waiters[owner] = deque()
+                self._owners.append(owner)
+            self._waiters[owner].append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters[owner].remove(waiter)
+                    if not self._waiters[owner]:
+                        del self._waiters[owner]
+                        self._owners.remove(owner)
+                    raise
+            # Granted while being cancelled: hand the slot on
+            self._release()
+            raise
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            while self._active < self.max_concurrency and self._owners:
+                owner = self._owners.popleft()
+                waiters = self._waiters[owner]
+                waiter = waiters.popleft()
+                if waiters:
+                    self._owners.append(owner)
+                else:
+                    del self._waiters[owner]
+                waiter.granted = True
+                self._active += 1
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                except RuntimeError:
+                    # The waiter's loop is closed, nobody will use the slot
+                    self._active -= 1
+
+
+def _wake(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# Shared by every ResearchManager that is not given its own executor
+default_executor = SearchExecutor(
+    max_concurrency=16,
+    rate_limits={SEARCH_CLIENT: TokenBucket(rate=5.0, burst=10)},
+)
+
+
+__all__ = [
+    "SEARCH_CLIENT",
+    "SearchExecutor",
+    "TokenBucket",
+    "default_executor",
+]
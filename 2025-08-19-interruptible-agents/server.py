@@ -0,0 +1,188 @@
+"""HTTP gateway for the interruptible research agent: start, steer, cancel and stream.
+
+    uv run server.py --port 8000
+
+    curl -X POST localhost:8000/conversations -H 'content-type: application/json' \
+        -d '{"query": "Why is a woodpeckers tongue so long?"}'
+    curl -N localhost:8000/conversations/<convo_id>/events
+
+Events are Server-Sent Events whose `id` is the event's sequence number, so a client that
+reconnects with Last-Event-ID picks up where it left off. Each stream reads from its own
+bounded `Subscription`; a client that cannot keep up gets coalesced or dropped events and
+a `gap` event saying how many it missed, instead of growing a buffer on the server.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import uuid
+from typing import AsyncIterator, Literal, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from runtime import FINISHED, ConversationRuntime, EventLoopPool, InMemoryAgentSystem, Message, ProgressEvent
+
+# Seconds between comment lines that keep idle connections open through proxies
+KEEPALIVE_SECONDS = 15
+
+load_dotenv("../.env")
+os.environ.setdefault("BAML_LOG", "error")
+
+system = InMemoryAgentSystem(
+    loop_pool=EventLoopPool(num_loops=int(os.environ.get("AGENT_LOOPS", "2"))),
+    stream_report=True,
+)
+
+app = FastAPI(title="Interruptible Agents API", version="1.0.0")
+
+
+class StartRequest(BaseModel):
+    query: str
+    convo_id: Optional[str] = None
+
+
+class MessageRequest(BaseModel):
+    kind: Literal["info", "replan"]
+    text: str
+
+
+class ConversationStatus(BaseModel):
+    convo_id: str
+    status: str
+    phase_index: int
+    last_seq: int
+
+
+def _status(runtime: ConversationRuntime) -> ConversationStatus:
+    return ConversationStatus(
+        convo_id=runtime.convo_id,
+        status=runtime.status,
+        phase_index=runtime.phase_index,
+        last_seq=runtime.last_seq,
+    )
+
+
+def _runtime(convo_id: str) -> ConversationRuntime:
+    try:
+        return system.get_runtime(convo_id)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown conversation '{convo_id}'")
+
+
+@app.post("/conversations", status_code=status.HTTP_201_CREATED, response_model=ConversationStatus)
+async def start_conversation(request: StartRequest) -> ConversationStatus:
+    convo_id = request.convo_id or uuid.uuid4().hex
+    try:
+        runtime = system.start(convo_id, request.query)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return _status(runtime)
+
+
+@app.get("/conversations/{convo_id}", response_model=ConversationStatus)
+async def get_conversation(convo_id: str) -> ConversationStatus:
+    return _status(_runtime(convo_id))
+
+
+@app.post("/conversations/{convo_id}/messages", status_code=status.HTTP_202_ACCEPTED, response_model=ConversationStatus)
+async def queue_message(convo_id: str, request: MessageRequest) -> ConversationStatus:
+    runtime = _runtime(convo_id)
+    system.queue(convo_id, Message(kind=request.kind, text=request.text))
+    return _status(runtime)
+
+
+@app.post("/conversations/{convo_id}/cancel", status_code=status.HTTP_202_ACCEPTED, response_model=ConversationStatus)
+async def cancel_conversation(convo_id: str) -> ConversationStatus:
+    runtime = _runtime(convo_id)
+    system.cancel(convo_id)
+    return _status(runtime)
+
+
+def format_event(evt: ProgressEvent) -> str:
+    data = json.dumps({"type": evt.event_type, "message": evt.message, "timestamp": evt.timestamp})
+    return f"id: {evt.seq}\nevent: {evt.event_type}\ndata: {data}\n\n"
+
+
+def format_gap(missed: int) -> str:
+    return f"event: gap\ndata: {json.dumps({'missed': missed})}\n\n"
+
+
+async def event_stream(
+    runtime: ConversationRuntime,
+    after: int,
+    max_pending: int,
+    policy: str,
+) -> AsyncIterator[str]:
+    # Subscribe before reading the backlog so nothing falls between the two
+    subscription = runtime.subscribe(max_pending, policy)
+    try:
+        backlog, missed = runtime.read_since(after, timeout=0)
+        if missed:
+            yield format_gap(backlog[0].seq - after - 1)
+        cursor = after
+        batch = [(0, evt) for evt in backlog]
+        while True:
+            for missed, evt in batch:
+                if evt.seq <= cursor:
+                    continue  # already sent from the backlog
+                # Mark a hole where it is, before the event that follows it; events up
+                # to the cursor were already sent from the backlog
+                missed = min(missed, evt.seq - cursor - 1)
+                if missed:
+                    yield format_gap(missed)
+                cursor = evt.seq
+                yield format_event(evt)
+                if evt.event_type == "done":
+                    return
+            if runtime.status in FINISHED and runtime.last_seq <= cursor:
+                return
+            try:
+                batch = await asyncio.wait_for(subscription.get_with_gaps(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                batch = []
+                yield ": keepalive\n\n"
+    finally:
+        runtime.unsubscribe(subscription)
+
+
+@app.get("/conversations/{convo_id}/events")
+async def stream_events(
+    convo_id: str,
+    after: int = Query(0, ge=0, description="Only send events with a higher sequence number"),
+    max_pending: int = Query(256, ge=1, le=10_000, description="Events buffered for this client"),
+    policy: Literal["coalesce", "drop"] = Query("coalesce"),
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    runtime = _runtime(convo_id)
+    if last_event_id:
+        try:
+            after = max(after, int(last_event_id))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid Last-Event-ID '{last_event_id}'"
+            )
+    # A cursor past the last event, e.g. from a stream before a restart, would skip new events
+    after = min(after, runtime.last_seq)
+    return StreamingResponse(
+        event_stream(runtime, after, max_pending, policy),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
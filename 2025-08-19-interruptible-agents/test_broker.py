@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import pytest
+
+from agents.planner_agent import WebSearchItem, WebSearchPlan
+from bench_load import FakeB, install_fakes
+from broker import Broker, RemoteConversation, run_worker
+from checkpoint import CheckpointStore
+from runtime import ProgressEvent
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def broker(tmp_path):
+    install_fakes(FakeB({"plan": 5, "search": 10, "write": 5}, 3, seed=0), max_search_concurrency=4)
+    broker = Broker(tmp_path / "broker.db")
+    yield broker
+    broker.close()
+
+
+@contextmanager
+def worker(broker: Broker, worker_id: str, checkpoint_path: Optional[str] = None) -> Iterator[None]:
+    """`run_worker` on a thread instead of a process; the fakes are installed in this one."""
+    thread = threading.Thread(target=run_worker, args=(str(broker.path), worker_id, checkpoint_path))
+    thread.start()
+    try:
+        wait_for(lambda: worker_id in broker.live_workers())
+        yield
+    finally:
+        broker.send_worker(worker_id, "stop")
+        thread.join()
+
+
+def orphan(broker: Broker, convo_id: str, events: int, phase_index: int) -> None:
+    """Leave `convo_id` routed to w1 mid-run, as a worker that died would."""
+    broker.register("w1")
+    broker.assign(convo_id, "topic")
+    broker.take_commands("w1")
+    history = [ProgressEvent(time.monotonic(), "info", str(seq), seq) for seq in range(1, events + 1)]
+    broker.publish(convo_id, history, "running", phase_index)
+
+
+def read_all(conversation: RemoteConversation) -> list:
+    events, missed = conversation.read_since(0, timeout=0)
+    assert not missed
+    return events
+
+
+def test_assign_routes_to_the_least_loaded_live_worker(broker):
+    broker.register("w1")
+    broker.register("w2")
+    assert broker.assign("c1", "q") == "w1"
+    assert broker.assign("c2", "q") == "w2"
+    assert broker.assign("c3", "q") == "w1"
+    broker.publish("c1", [], "done", 4)
+    # Finished conversations do not count towards a worker's load
+    assert broker.assign("c4", "q") == "w1"
+
+    with pytest.raises(RuntimeError):
+        broker.assign("c2", "q")
+    with pytest.raises(KeyError):
+        broker.send("missing", "info", "text")
+
+    with broker._db:
+        broker._db.execute("UPDATE workers SET heartbeat = 0")
+    with pytest.raises(RuntimeError):
+        broker.assign("c5", "q")
+
+
+def test_owned_skips_routes_whose_start_is_still_queued(broker):
+    broker.register("w1")
+    broker.assign("c1", "q1")
+    broker.assign("c2", "q2")
+    assert [kind for _, kind, _ in broker.take_commands("w1")] == ["start", "start"]
+    broker.assign("c3", "q3")
+    broker.publish("c1", [], "running", 1)
+    assert sorted(broker.owned("w1")) == [("c1", 0), ("c2", 0)]
+
+
+def test_worker_runs_a_conversation_and_streams_it(broker):
+    with worker(broker, "w1"):
+        broker.assign("c1", "topic")
+        conversation = RemoteConversation(broker, "c1")
+
+        async def follow() -> list[int]:
+            subscription = conversation.subscribe()
+            try:
+                seqs = [evt.seq for evt in read_all(conversation)]
+                while not seqs or seqs[-1] != conversation.last_seq or conversation.status != "done":
+                    for missed, evt in await asyncio.wait_for(subscription.get_with_gaps(), 10):
+                        assert missed == 0
+                        if not seqs or evt.seq > seqs[-1]:
+                            seqs.append(evt.seq)
+            finally:
+                conversation.unsubscribe(subscription)
+            return seqs
+
+        seqs = asyncio.run(follow())
+
+    assert seqs == list(range(1, len(seqs) + 1))
+    assert conversation.status == "done"
+    assert [evt.event_type for evt in read_all(conversation)][-1] == "done"
+
+
+def test_restarted_worker_resumes_and_continues_the_sequence(broker, tmp_path):
+    checkpoint_path = str(tmp_path / "research.db")
+    store = CheckpointStore(checkpoint_path)
+    plan = WebSearchPlan(searches=[WebSearchItem(reason=f"r{i}", query=f"q{i}") for i in range(3)])
+    orphan(broker, "c1", events=12, phase_index=2)
+    store.start("c1", "topic")
+    store.save_plan("c1", plan)
+    store.save_search("c1", plan.searches[0], "summary 0")
+    store.save_state("c1", "topic", 2, "running")
+    store.close()
+
+    with worker(broker, "w1", checkpoint_path):
+        wait_for(lambda: broker.route("c1")[1] == "done")
+
+    events = read_all(RemoteConversation(broker, "c1"))
+    assert [evt.seq for evt in events] == list(range(1, len(events) + 1))
+    assert events[12].event_type == "resume"
+    assert broker.route("c1")[3] == events[-1].seq
+
+
+def test_unresumable_conversation_is_reported_as_an_error(broker):
+    orphan(broker, "c1", events=7, phase_index=2)
+
+    # No checkpoint store, so nothing can be resumed
+    with worker(broker, "w1"):
+        wait_for(lambda: broker.route("c1")[1] == "error")
+
+    events = read_all(RemoteConversation(broker, "c1"))[7:]
+    assert [(evt.seq, evt.event_type) for evt in events] == [(8, "error"), (9, "done")]
+    assert "could not be resumed" in events[0].message
+    assert events[1].message == "error"
+    assert broker.route("c1") == ("w1", "error", 2, 9)
+
+
+def test_prune_forgets_conversations_past_retention(broker):
+    broker.register("w1")
+    broker.assign("c1", "topic")
+    broker.publish("c1", [ProgressEvent(time.monotonic(), "done", "done", 1)], "done", 3)
+    broker.assign("c2", "topic")
+    broker.publish("c2", [ProgressEvent(time.monotonic(), "start", "topic", 1)], "running", 1)
+
+    assert broker.prune(retention=3600) == 0
+    assert broker.prune(retention=0) == 1
+    assert broker.route("c1") is None
+    assert broker.read_events("c1", 0) == []
+    assert broker.route("c2") is not None
+    with pytest.raises(KeyError):
+        RemoteConversation(broker, "c1").status
+    # A pruned id is free to be started again
+    assert broker.assign("c1", "again") == "w1"
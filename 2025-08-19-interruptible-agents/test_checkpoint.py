@@ -0,0 +1,170 @@
+import time
+from collections import Counter
+from typing import Any, Callable
+
+import pytest
+
+from agents.planner_agent import WebSearchItem, WebSearchPlan
+from agents.writer_agent import ReportData
+from bench_load import FakeB, install_fakes
+from checkpoint import CheckpointStore
+from runtime import EventLoopPool, InMemoryAgentSystem, Message
+
+
+class CountingFakeB(FakeB):
+    """FakeB that counts the calls each agent makes."""
+
+    def __init__(self, latency_ms: dict[str, float], searches: int, seed: int = 0) -> None:
+        super().__init__(latency_ms, searches, seed)
+        self.calls: Counter[str] = Counter()
+
+    async def PlanWebSearches(self, query: str) -> Any:
+        self.calls["plan"] += 1
+        return await super().PlanWebSearches(query)
+
+    async def SummarizeSearchTerm(self, term: str, reason: str) -> str:
+        self.calls["search"] += 1
+        return await super().SummarizeSearchTerm(term, reason)
+
+    async def WriteResearchReport(self, query: str, summaries: list[str]) -> Any:
+        self.calls["write"] += 1
+        return await super().WriteResearchReport(query, summaries)
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(tmp_path / "research.db")
+    yield store
+    store.close()
+
+
+def test_store_round_trip(store):
+    plan = WebSearchPlan(searches=[WebSearchItem(reason="r0", query="q0"), WebSearchItem(reason="r1", query="q1")])
+    store.start("c", "topic")
+    store.save_plan("c", plan)
+    store.save_search("c", plan.searches[0], "summary 0")
+    store.push_message("c", "info", "first")
+    store.push_message("c", "info", "second")
+    store.drop_messages("c", 1)
+    store.save_state("c", "topic, refined", 2, "running")
+
+    checkpoint = store.load("c")
+    assert checkpoint.initial_query == "topic"
+    assert checkpoint.current_query == "topic, refined"
+    assert checkpoint.phase_index == 2
+    assert checkpoint.plan == plan
+    assert checkpoint.summaries == {("q0", "r0"): "summary 0"}
+    assert checkpoint.pending == [("info", "second")]
+    assert checkpoint.report is None
+
+    # A new plan invalidates the summaries of the old one
+    store.save_plan("c", WebSearchPlan(searches=[]))
+    assert store.load("c").summaries == {}
+    assert store.load("missing") is None
+
+
+def test_restart_mid_search_resumes_without_redoing_finished_work(store):
+    fake = CountingFakeB({"plan": 5, "search": 100, "write": 5}, searches=5)
+    # One search at a time, so stopping after the first summary leaves the rest undone
+    install_fakes(fake, max_search_concurrency=1)
+    pool = EventLoopPool(1)
+    system = InMemoryAgentSystem(loop_pool=pool, checkpoints=store)
+    system.start("c", "topic")
+    wait_for(lambda: len(store.load("c").summaries) >= 1)
+    pool.shutdown()
+
+    checkpoint = store.load("c")
+    assert checkpoint.status == "running"
+    assert checkpoint.phase_index == 2
+    saved = len(checkpoint.summaries)
+    assert 1 <= saved < 5
+
+    install_fakes(fake, max_search_concurrency=1)
+    fake.calls.clear()
+    pool = EventLoopPool(1)
+    try:
+        system = InMemoryAgentSystem(loop_pool=pool, checkpoints=store)
+        runtime = system.resume("c")
+        wait_for(lambda: system.is_done("c"))
+    finally:
+        pool.shutdown()
+
+    assert runtime.status == "done"
+    assert fake.calls["plan"] == 0
+    assert fake.calls["search"] == 5 - saved
+    assert fake.calls["write"] == 1
+    events = [evt.event_type for evt in runtime.events]
+    assert events[0] == "resume"
+    checkpoint = store.load("c")
+    assert checkpoint.status == "done"
+    assert len(checkpoint.summaries) == 5
+    assert checkpoint.report is not None
+
+
+def test_resume_reuses_a_checkpointed_report(store):
+    plan = WebSearchPlan(searches=[WebSearchItem(reason="r", query="q")])
+    report = ReportData(short_summary="short", markdown_report="# Report", follow_up_questions=["next?"])
+    store.start("c", "topic")
+    store.save_plan("c", plan)
+    store.save_search("c", plan.searches[0], "summary")
+    store.save_report("c", report)
+    store.save_state("c", "topic", 3, "running")
+
+    fake = CountingFakeB({"plan": 5, "search": 5, "write": 5}, searches=1)
+    install_fakes(fake, max_search_concurrency=1)
+    pool = EventLoopPool(1)
+    try:
+        system = InMemoryAgentSystem(loop_pool=pool, checkpoints=store)
+        runtime = system.resume("c")
+        wait_for(lambda: system.is_done("c"))
+    finally:
+        pool.shutdown()
+
+    assert runtime.status == "done"
+    assert sum(fake.calls.values()) == 0
+    assert ("report_markdown", "# Report") in [(evt.event_type, evt.message) for evt in runtime.events]
+
+
+def test_queued_messages_survive_a_restart(store):
+    fake = CountingFakeB({"plan": 5, "search": 100, "write": 5}, searches=5)
+    install_fakes(fake, max_search_concurrency=1)
+    pool = EventLoopPool(1)
+    system = InMemoryAgentSystem(loop_pool=pool, checkpoints=store)
+    system.start("c", "topic")
+    wait_for(lambda: len(store.load("c").summaries) >= 1)
+    system.queue("c", Message(kind="info", text="be brief"))
+    pool.shutdown()
+    assert store.load("c").pending == [("info", "be brief")]
+
+    install_fakes(fake, max_search_concurrency=1)
+    pool = EventLoopPool(1)
+    try:
+        system = InMemoryAgentSystem(loop_pool=pool, checkpoints=store)
+        runtime = system.resume("c")
+        wait_for(lambda: system.is_done("c"))
+    finally:
+        pool.shutdown()
+
+    assert runtime.status == "done"
+    checkpoint = store.load("c")
+    assert checkpoint.pending == []
+    assert "be brief" in checkpoint.current_query
+
+
+def test_resume_refuses_unknown_and_cancelled_conversations(store):
+    system = InMemoryAgentSystem(checkpoints=store)
+    with pytest.raises(KeyError):
+        system.resume("missing")
+    store.start("c", "topic")
+    store.save_status("c", "cancelled")
+    with pytest.raises(RuntimeError):
+        system.resume("c")
+    with pytest.raises(RuntimeError):
+        InMemoryAgentSystem().resume("c")
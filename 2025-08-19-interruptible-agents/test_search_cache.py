@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable
+
+import pytest
+
+from bench_load import FakeB
+from search_cache import SearchSummaryCache
+
+
+def counting_search(fake: FakeB) -> tuple[list[str], Callable[[str, str], Callable[[], Awaitable[str]]]]:
+    """A compute factory over `fake` that records every search it actually runs."""
+    calls: list[str] = []
+
+    def compute(term: str, reason: str) -> Callable[[], Awaitable[str]]:
+        async def call() -> str:
+            calls.append(term)
+            return await fake.SummarizeSearchTerm(term, reason)
+
+        return call
+
+    return calls, compute
+
+
+def test_concurrent_misses_share_one_call():
+    cache = SearchSummaryCache()
+    calls, compute = counting_search(FakeB({"search": 20}, 1, seed=0))
+
+    async def main():
+        searches = (cache.get_or_compute("Woodpecker  TONGUE", "why", compute("woodpecker tongue", "why")) for _ in range(5))
+        return await asyncio.gather(*searches)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert len(set(results)) == 1
+    assert cache.misses == 1 and cache.hits["shared"] == 4
+    # Normalized key: a later lookup with different spacing and case is a memory hit
+    assert cache.get("woodpecker tongue", "WHY") == results[0]
+
+
+def test_calls_are_shared_across_event_loops():
+    cache = SearchSummaryCache()
+    calls, compute = counting_search(FakeB({"search": 100}, 1, seed=0))
+    results: list[str] = []
+
+    def worker():
+        results.append(asyncio.run(cache.get_or_compute("term", "reason", compute("term", "reason"))))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(results) == 4 and len(set(results)) == 1
+
+
+def test_leader_failure_reaches_followers_and_is_not_cached():
+    cache = SearchSummaryCache()
+
+    async def fail() -> str:
+        await asyncio.sleep(0.02)
+        raise ValueError("search failed")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("t", "r", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.get("t", "r") is None
+    assert not cache._in_flight
+
+
+def test_failed_cache_write_still_answers_followers(monkeypatch):
+    cache = SearchSummaryCache()
+    _, compute = counting_search(FakeB({"search": 20}, 1, seed=0))
+
+    def broken_put(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache, "put", broken_put)
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("t", "r", compute("t", "r")) for _ in range(5)))
+
+    results = asyncio.run(asyncio.wait_for(main(), timeout=5))
+    assert len(results) == 5 and len(set(results)) == 1
+    assert not cache._in_flight
+
+
+def test_follower_takes_over_from_a_stalled_leader():
+    cache = SearchSummaryCache(wait_timeout=0.2)
+    leader_started = threading.Event()
+    leader_loop = asyncio.new_event_loop()
+
+    async def stall() -> str:
+        leader_started.set()
+        await asyncio.Event().wait()
+        return "never"
+
+    # The leader's loop is stopped mid-call and never resumes, like a wedged worker loop
+    leader = asyncio.run_coroutine_threadsafe(cache.get_or_compute("t", "r", stall), leader_loop)
+    thread = threading.Thread(target=leader_loop.run_forever)
+    thread.start()
+    try:
+        assert leader_started.wait(5)
+        leader_loop.call_soon_threadsafe(leader_loop.stop)
+        thread.join()
+
+        async def follow() -> str:
+            return "fresh"
+
+        assert asyncio.run(cache.get_or_compute("t", "r", follow)) == "fresh"
+        assert cache.get("t", "r") == "fresh"
+    finally:
+        leader.cancel()
+        leader_loop.close()
+
+
+def test_cancelled_leader_hands_over_to_a_follower():
+    cache = SearchSummaryCache()
+
+    async def main():
+        started = asyncio.Event()
+
+        async def slow() -> str:
+            started.set()
+            await asyncio.sleep(10)
+            return "slow"
+
+        async def fast() -> str:
+            return "fast"
+
+        leader = asyncio.create_task(cache.get_or_compute("t", "r", slow))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_compute("t", "r", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "fast"
+
+
+def test_disk_entries_survive_a_new_cache(tmp_path):
+    db_path = tmp_path / "summaries.db"
+    SearchSummaryCache(db_path=db_path).put("t", "r", "summary")
+    cache = SearchSummaryCache(db_path=db_path)
+    assert cache.get("t", "r") == "summary"
+    assert cache.hits["disk"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = SearchSummaryCache(ttl_seconds=-1)
+    cache.put("t", "r", "summary")
+    assert cache.get("t", "r") is None
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from bench_load import FakeB, install_fakes
+from runtime import ConversationRuntime, ProgressEvent, Subscription
+
+
+def evt(seq: int, event_type: str = "info", message: str = "") -> ProgressEvent:
+    return ProgressEvent(float(seq), event_type, message or f"m{seq}", seq)
+
+
+def drain(policy: str, max_pending: int, events: list[ProgressEvent]) -> tuple[list[tuple[int, ProgressEvent]], int]:
+    """Push `events` into a fresh subscription without reading, then take what is left."""
+
+    async def main():
+        subscription = Subscription(asyncio.get_running_loop(), max_pending, policy)
+        for event in events:
+            subscription.push(event)
+        return await subscription.get_with_gaps(), subscription.dropped
+
+    return asyncio.run(main())
+
+
+def test_drop_policy_drops_oldest_and_marks_the_gap():
+    entries, dropped = drain("drop", 3, [evt(seq) for seq in range(1, 7)])
+    assert [(missed, event.seq) for missed, event in entries] == [(3, 4), (0, 5), (0, 6)]
+    assert dropped == 3
+
+
+def test_coalesce_concatenates_report_deltas():
+    deltas = [evt(seq, "report_partial", f"d{seq} ") for seq in range(1, 11)]
+    entries, dropped = drain("coalesce", 2, deltas)
+    assert dropped == 0
+    assert all(missed == 0 for missed, _ in entries)
+    assert "".join(event.message for _, event in entries) == "".join(delta.message for delta in deltas)
+    # The merged event carries the newest seq, so a resuming client skips what it has
+    assert entries[-1][1].seq == 10
+
+
+def test_coalesce_keeps_only_the_latest_progress():
+    events = [evt(1, "phase")] + [evt(seq, "progress", f"{seq}/9") for seq in range(2, 10)]
+    entries, dropped = drain("coalesce", 2, events)
+    assert [(missed, event.event_type, event.message) for missed, event in entries] == [
+        (0, "phase", "m1"),
+        (0, "progress", "9/9"),
+    ]
+    assert dropped == 0
+
+
+def test_coalesce_evicts_other_events_before_deltas():
+    events = [evt(1), evt(2, "report_partial", "a"), evt(3), evt(4)]
+    entries, dropped = drain("coalesce", 3, events)
+    # info 1 is dropped; the delta keeps its place and carries the gap
+    assert [(missed, event.seq) for missed, event in entries] == [(1, 2), (0, 3), (0, 4)]
+    assert dropped == 1
+
+
+def test_coalesce_merges_across_a_gap():
+    events = [evt(1, "report_partial", "a"), evt(2), evt(3, "report_partial", "b"), evt(4), evt(5, "report_partial", "c")]
+    entries, _ = drain("coalesce", 2, events)
+    # Every delta survives; the dropped info events are counted where they were
+    assert "".join(event.message for _, event in entries if event.event_type == "report_partial") == "abc"
+    assert sum(missed for missed, _ in entries) == 2
+
+
+def test_closed_subscription_returns_empty():
+    async def main():
+        subscription = Subscription(asyncio.get_running_loop())
+        waiter = asyncio.create_task(subscription.get())
+        await asyncio.sleep(0)
+        subscription.close()
+        subscription.push(evt(1))
+        return await waiter
+
+    assert asyncio.run(main()) == []
+
+
+def test_unknown_policy_is_rejected():
+    loop = asyncio.new_event_loop()
+    try:
+        with pytest.raises(ValueError):
+            Subscription(loop, policy="newest")
+    finally:
+        loop.close()
+
+
+def test_read_since_flags_events_that_fell_out_of_the_buffer():
+    runtime = ConversationRuntime("c", max_events=3)
+    for i in range(5):
+        runtime.emit("info", str(i))
+    events, missed = runtime.read_since(0, timeout=0)
+    assert [event.seq for event in events] == [3, 4, 5] and missed
+    events, missed = runtime.read_since(3, timeout=0)
+    assert [event.seq for event in events] == [4, 5] and not missed
+
+
+def test_event_stream_marks_gaps_inline():
+    import server
+
+    runtime = ConversationRuntime("c")
+
+    async def main():
+        stream = server.event_stream(runtime, after=0, max_pending=2, policy="drop")
+        first = asyncio.create_task(stream.__anext__())
+        # Let the stream subscribe and start waiting before it falls behind
+        await asyncio.sleep(0)
+        for i in range(5):
+            runtime.emit("info", str(i))
+        runtime.status = "done"
+        runtime.emit("done", "done")
+        chunks = [await first]
+        async for chunk in stream:
+            chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(main())
+    assert chunks[0] == server.format_gap(4)
+    assert [chunk.split("\n")[0] for chunk in chunks[1:]] == ["id: 5", "id: 6"]
+
+
+def test_stream_resumes_after_last_event_id():
+    import server
+
+    install_fakes(FakeB({"plan": 5, "search": 5, "write": 5}, 2, seed=0), max_search_concurrency=4)
+    runtime = server.system.start("resume-test", "topic")
+    deadline = time.monotonic() + 10
+    while not server.system.is_done("resume-test"):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    async def ids(after: int = 0, last_event_id: str | None = None) -> list[str]:
+        response = await server.stream_events("resume-test", after, 256, "coalesce", last_event_id)
+        chunks = [chunk async for chunk in response.body_iterator]
+        return [line for chunk in chunks for line in chunk.split("\n") if line.startswith("id:")]
+
+    last = runtime.last_seq
+    assert asyncio.run(ids(last_event_id=str(last - 2))) == [f"id: {last - 1}", f"id: {last}"]
+    assert asyncio.run(ids(after=last - 1, last_event_id=str(last - 2))) == [f"id: {last}"]
+    # A cursor from the future is clamped instead of hiding events, and the finished stream ends
+    assert asyncio.run(ids(last_event_id="99999")) == []
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(ids(last_event_id="abc"))
+    assert error.value.status_code == 400